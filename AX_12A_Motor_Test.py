@@ -173,6 +173,9 @@ import os
 import sys
 import time
 from dynamixel_sdk import *
+from dxl_latency_tuner import GoalWriter
+from dxl_baud_manager import find_baudrate
+from motion_wait import wait_for_goal
 
 # Control table address
 ADDR_MX_TORQUE_ENABLE      = 24
@@ -185,6 +188,7 @@ ADDR_MX_TORQUE_LIMIT       = 34
 
 # Protocol version
 PROTOCOL_VERSION            = 1.0
+DXL_MODEL                   = "AX-12A"
 
 # Default setting
 DXL_ID                      = 101
@@ -201,8 +205,11 @@ POSITION_THRESHOLD          = 10   # ticks tolerance
 portHandler = PortHandler(DEVICENAME)
 packetHandler = PacketHandler(PROTOCOL_VERSION)
 
-if not portHandler.openPort() or not portHandler.setBaudRate(BAUDRATE):
-    print("❌ Failed to open port or set baudrate")
+if not portHandler.openPort():
+    print("❌ Failed to open port")
+    quit()
+if find_baudrate(portHandler, packetHandler, DXL_ID, BAUDRATE) is None:
+    print(f"❌ DXL ID {DXL_ID} not found at any standard baud rate")
     quit()
 
 # ---------------- Set Joint Mode ----------------
@@ -215,6 +222,8 @@ packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_MX_TORQUE_ENABLE, TORQUE_
 packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_TORQUE_LIMIT, DXL_TORQUE_LIMIT)
 packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_MOVING_SPEED, DXL_MOVING_SPEED)
 
+goal_writer = GoalWriter(portHandler, packetHandler, DXL_ID, DXL_MODEL)
+
 print("✅ Joint mode enabled. Type a position (0-1023) or 'q' to quit.")
 
 while True:
@@ -231,16 +240,17 @@ while True:
         continue
 
     # Move to the typed position
-    packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_GOAL_POSITION, goal_position)
-
-    # Wait until the position is reached
-    while True:
-        present_position, _, _ = packetHandler.read2ByteTxRx(portHandler, DXL_ID, ADDR_MX_PRESENT_POSITION)
-        print(f"[ID:{DXL_ID}] GoalPos:{goal_position}  PresentPos:{present_position}", end='\r')
-        if abs(present_position - goal_position) <= POSITION_THRESHOLD:
-            print(f"\n✅ Reached position {goal_position}")
-            break
-        time.sleep(0.05)
+    goal_writer.write(ADDR_MX_GOAL_POSITION, 2, goal_position)
+
+    # Wait until the position is reached, polling more often as it gets close
+    reached, present_position, polls = wait_for_goal(
+        portHandler, packetHandler, DXL_ID, DXL_MODEL, goal_position, POSITION_THRESHOLD, speed=DXL_MOVING_SPEED,
+        on_sample=lambda position: print(f"[ID:{DXL_ID}] GoalPos:{goal_position}  PresentPos:{position}", end='\r'),
+    )
+    if reached:
+        print(f"\n✅ Reached position {goal_position} ({polls} reads)")
+    else:
+        print(f"\n⚠️ Stopped at {present_position} before reaching {goal_position}")
 
 # Disable torque and close port
 packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_MX_TORQUE_ENABLE, TORQUE_DISABLE)
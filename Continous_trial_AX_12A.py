@@ -1,11 +1,20 @@
 from dynamixel_sdk import *
+from dxl_telemetry import MODELS, read_telemetry
+from dxl_latency_tuner import GoalWriter
+from dxl_baud_manager import find_baudrate
+from acquisition import AcquisitionThread
+from live_plot import LivePlot
+from rpm_filter import SpikeFilter
+from odometry import Odometer, max_unaliased_rpm
+from dxl_instrument import InstrumentedPacketHandler
+from sample_store import SampleStore
+from online_stats import RunningStats
 import os
 import matplotlib.pyplot as plt
 import time
 
 # ---------------- Settings ----------------
 ADDR_MX_TORQUE_ENABLE      = 24
-ADDR_MX_GOAL_POSITION      = 30
 ADDR_MX_PRESENT_POSITION   = 36
 ADDR_MX_MOVING_SPEED       = 32
 ADDR_MX_PRESENT_SPEED      = 38
@@ -15,6 +24,7 @@ ADDR_MX_PRESENT_LOAD       = 40
 ADDR_MX_TORQUE_LIMIT       = 34   # NEW: Torque Limit register
 
 PROTOCOL_VERSION           = 1.0
+DXL_MODEL                  = "AX-12A"
 
 DXL_ID                     = 101
 BAUDRATE                   = 1000000
@@ -22,39 +32,55 @@ DEVICENAME                 = 'com6'
 
 TORQUE_ENABLE              = 1
 TORQUE_DISABLE             = 0
-DXL_MOVING_STATUS_THRESHOLD = 20
 DXL_MOVING_SPEED           = 1023   # adjust for desired RPM
 
-TICKS_PER_REV              = 4096
-REVOLUTIONS                = 10     # how many full 360° turns
+REVOLUTIONS                = 10     # how many full 360° turns, counted by the odometer
 
 DXL_TORQUE_LIMIT           = 1023    # NEW: 50% of maximum torque (0–1023)
 
+SAMPLE_RATE_HZ             = 100     # acquisition thread rate
+PROCESS_PERIOD             = 0.05    # how often the main loop drains new samples
+LIVE_PLOT                  = True    # blitted speed view during the run
+STATS_ONLY                 = False   # keep running RPM statistics only, no trace or plot (long runs)
+INSTRUMENT                 = False   # time every bus call; table printed at exit
+
+RPM_AVERAGE_SIZE           = 5       # spike filter window (samples)
+RPM_CLAMP                  = 70      # readings above this are replaced by the average
+# Spike limit above the running average, looser at high torque limits
+RPM_SPIKE_LIMIT            = 60 if DXL_TORQUE_LIMIT > 700 else 30
+
 # ---------------- Utility for getch ----------------
 if os.name == 'nt':
     import msvcrt
     def getch(): return msvcrt.getch().decode()
+    def kbhit(): return msvcrt.kbhit()
 else:
-    import sys, tty, termios
+    import sys, tty, termios, select
     fd = sys.stdin.fileno()
     old_settings = termios.tcgetattr(fd)
     def getch():
         try:
-            tty.setraw(fd)
+            tty.setraw(fd, termios.TCSANOW)  # don't flush a key kbhit() already saw
             ch = sys.stdin.read(1)
         finally:
             termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
         return ch
+    def kbhit():
+        # Keys are only visible to select() outside line mode; getch() restores it
+        tty.setcbreak(fd, termios.TCSANOW)
+        return bool(select.select([fd], [], [], 0)[0])
 
 # ---------------- Init ----------------
 portHandler = PortHandler(DEVICENAME)
 packetHandler = PacketHandler(PROTOCOL_VERSION)
+if INSTRUMENT:
+    packetHandler = InstrumentedPacketHandler(packetHandler)
 
 if not portHandler.openPort():
     print("Failed to open port")
     quit()
-if not portHandler.setBaudRate(BAUDRATE):
-    print("Failed to set baudrate")
+if find_baudrate(portHandler, packetHandler, DXL_ID, BAUDRATE) is None:
+    print(f"DXL ID {DXL_ID} not found at any standard baud rate")
     quit()
 print("Waiting for 's' to start... (Press 'q' to quit)")
 while True:
@@ -67,14 +93,14 @@ while True:
         portHandler.closePort()
         quit()
 
-# ---------------- Set Multi-Turn Limits ----------------
+# ---------------- Set Wheel Mode ----------------
 # Disable torque before changing limits
 packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_MX_TORQUE_ENABLE, TORQUE_DISABLE)
 
-# Allow CW from 0 ticks to CCW up to 5 turns worth of ticks
-max_position_limit = TICKS_PER_REV * REVOLUTIONS
+# The AX-12A position only spans 0-1023 over 300°, so there is no multi-turn
+# goal: both limits at 0 select continuous rotation and the odometer counts turns
 packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_CW_ANGLE_LIMIT, 0)
-packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_CCW_ANGLE_LIMIT, max_position_limit)
+packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_CCW_ANGLE_LIMIT, 0)
 
 # Enable torque again
 packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_MX_TORQUE_ENABLE, TORQUE_ENABLE)
@@ -90,110 +116,95 @@ elif dxl_error != 0:
 else:
     print(f"Torque limit set to {DXL_TORQUE_LIMIT}/1023")
 
-# ---------------- Set Speed ----------------
-packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_MOVING_SPEED, DXL_MOVING_SPEED)
-
-# ---------------- Get Start Position ----------------
-dxl_present_position, _, _ = packetHandler.read2ByteTxRx(portHandler, DXL_ID, ADDR_MX_PRESENT_POSITION)
-print(f"Start position: {dxl_present_position}")
-
-# Target = start position + (5 revolutions worth of ticks)
-target_position = dxl_present_position + (TICKS_PER_REV * REVOLUTIONS)
-print(f"Target position: {target_position}")
-
 # ---------------- Command Move ----------------
-packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_GOAL_POSITION, target_position)
+goal_writer = GoalWriter(portHandler, packetHandler, DXL_ID, DXL_MODEL)
+goal_writer.write(ADDR_MX_MOVING_SPEED, 2, DXL_MOVING_SPEED)
 
-# ---------------- Wait Until Done ----------------
+# ---------------- Revolution Counting ----------------
 counter = 0
-counter_goal_position = REVOLUTIONS*(360 / 300)
-threshold = 10  # tolerance for near zero
-dxl_present_position_prev = None  # initialize as None for first loop
+odometer = Odometer(DXL_MODEL)
+commanded_rpm = (DXL_MOVING_SPEED & 0x3FF) * MODELS[DXL_MODEL]["rpm_per_unit"]
+if commanded_rpm > max_unaliased_rpm(SAMPLE_RATE_HZ):
+    print(f"⚠ {SAMPLE_RATE_HZ} Hz is too slow to unwrap {commanded_rpm:.0f} rpm from position alone; "
+          "turns are inferred from speed")
 
 # ---------------- Record Present Speed ----------------
-timestamps = []
-rpm_values = []
-start_time = time.time()
-rpm_average_size = 5
-rpm_buffer = []
-while True:
-    current_time = time.time()
-    dxl_present_position_cur, _, _ = packetHandler.read2ByteTxRx(portHandler, DXL_ID, ADDR_MX_PRESENT_POSITION)
-    speed_raw, _, _ = packetHandler.read2ByteTxRx(portHandler, DXL_ID, ADDR_MX_PRESENT_SPEED)
-
-    if dxl_present_position_prev is None:
-        dxl_present_position_prev = dxl_present_position_cur
-        continue
-
-    # Detect crossing from above threshold to within threshold (near zero)
-    if abs(dxl_present_position_cur) <= threshold and abs(dxl_present_position_prev) > threshold:
-        counter += 1
-        print(f"Pass {counter}: Goal Position: {counter_goal_position}")
-        if key == 'q':
+# Typed columns, 12 bytes a sample; plotting and averaging use them directly
+samples = SampleStore((("time", "f8"), ("rpm", "f4")))
+rpm_stats = RunningStats()
+rpm_filter = SpikeFilter(window=RPM_AVERAGE_SIZE, clamp=RPM_CLAMP, spike_limit=RPM_SPIKE_LIMIT)
+
+# Sampling runs in its own thread; counting and filtering below never delay it
+acquisition = AcquisitionThread(
+    lambda: read_telemetry(portHandler, packetHandler, DXL_ID, DXL_MODEL)[0],
+    SAMPLE_RATE_HZ,
+)
+acquisition.start()
+if LIVE_PLOT:
+    live = LivePlot(acquisition.buffer, [("velocity", "Speed (rev/min)", 114/1023)],
+                    window=10 * SAMPLE_RATE_HZ, title="AX-12A live")
+cursor = 0
+done = False
+try:
+    while not done:
+        if kbhit() and getch().lower() == 'q':
             print("Quitting program.")
             break
-    # Calculate RPM
-    if speed_raw >1023:
-        signed_raw = -(speed_raw - 1024)
-    else:
-        signed_raw = speed_raw
-    
-    dxl_present_position_prev = dxl_present_position_cur
-    # Calculating RPM values
-    rpm = speed_raw * 114/1023
-
-    # Calculate current average before appending new value
-    if len(rpm_buffer) > 0:
-        rpm_average = sum(rpm_buffer) / len(rpm_buffer)
-    else:
-        rpm_average = rpm  # First value, no average yet
-
-    # Spike check: if new rpm is >30 above average, clamp it
-    if DXL_TORQUE_LIMIT > 700:
-        adjusted_limit = 60
-    else:
-        adjusted_limit = 30
-    if rpm >70:
-        rpm = rpm_average
-    if rpm > rpm_average + adjusted_limit:
-        rpm_smooth = rpm_average
-    else:
-        rpm_smooth = rpm
-
-    # Now append the *filtered* value to buffer
-    rpm_buffer.append(rpm_smooth)
-
-    # Keep buffer size fixed
-    if len(rpm_buffer) > rpm_average_size:
-        rpm_buffer.pop(0)
-
-    # Save values
-    rpm_values.append(rpm_smooth)
-    timestamps.append(current_time - start_time)
-
-
-
-    
-    if counter >= counter_goal_position:
-        print("Reached target position.")
-        break
-
-    # Optionally break if close to target position (can remove if not useful)
-    if abs(target_position - dxl_present_position_cur) <= DXL_MOVING_STATUS_THRESHOLD:
-        break
-    
-# ---------------- Shutdown ----------------
-packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_MX_TORQUE_ENABLE, TORQUE_DISABLE)
-portHandler.closePort() 
-if len(rpm_values) > 0:
-    overall_average = sum(rpm_values) / len(rpm_values)
-    print(f"Overall Average RPM: {overall_average:.2f}")
+        records, cursor, _ = acquisition.buffer.read(cursor)
+        for elapsed, dxl_present_position_cur, signed_raw, load in records:
+            # Unwrap position into turns; a crossing can't be missed between samples
+            odometer.update(elapsed, dxl_present_position_cur, signed_raw)
+            if int(abs(odometer.revolutions)) > counter:
+                counter = int(abs(odometer.revolutions))
+                print(f"Pass {counter}: {odometer.angle:.0f}° of {REVOLUTIONS * 360}°")
+
+            # Calculating RPM values (speed is already signed, CW negative)
+            rpm = signed_raw * 114/1023
+
+            # Replace spikes with the running average of the filtered values
+            rpm_smooth = rpm_filter.update(rpm)
+
+            # Save values
+            rpm_stats.update(rpm_smooth)
+            if not STATS_ONLY:
+                samples.append(elapsed, rpm_smooth)
+
+            if counter >= REVOLUTIONS:
+                print("Reached target position.")
+                done = True
+                break
+
+        if LIVE_PLOT:
+            live.refresh()
+        if not done:
+            time.sleep(PROCESS_PERIOD)
+finally:
+    # ---------------- Shutdown ----------------
+    # Also runs on Ctrl-C, so the servo is never left spinning with torque on
+    acquisition.stop()
+    goal_writer.write(ADDR_MX_MOVING_SPEED, 2, 0)
+    packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_MX_TORQUE_ENABLE, TORQUE_DISABLE)
+    portHandler.closePort()
+
+if LIVE_PLOT:
+    live.close()
+print(acquisition.scheduler.report())
+if odometer.mismatches or odometer.alias_risk:
+    print(f"⚠ Odometry: {odometer.mismatches} position/speed mismatches, "
+          f"{odometer.alias_risk} steps over half a turn")
+if INSTRUMENT:
+    print(packetHandler.report())
+if rpm_stats.count > 0:
+    print(f"Overall Average RPM: {rpm_stats.mean:.2f}")
+    print(rpm_stats.report("RPM"))
 else:
     print("No RPM data collected.")
 
 # ---------------- Plot ----------------
+if STATS_ONLY:
+    quit()
 plt.figure(figsize=(10,5))
-plt.plot(timestamps, rpm_values, label="Present Speed (rev/min)")
+plt.plot(samples["time"], samples["rpm"], label="Present Speed (rev/min)")
 plt.xlabel("Time (s)")
 plt.ylabel("Speed (rev/min)")
 plt.title("AX-12A Present Speed Over Time")
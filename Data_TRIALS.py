@@ -1,4 +1,17 @@
 from dynamixel_sdk import *
+from dxl_telemetry import read_telemetry
+from dxl_latency_tuner import GoalWriter
+from dxl_baud_manager import find_baudrate
+from dxl_register_mirror import RegisterMirror
+from trajectory import TrajectoryStreamer, min_jerk, report
+from dxl_instrument import InstrumentedPacketHandler
+from dxl_broker import BrokerPort, BrokerPacketHandler
+from acquisition import AcquisitionThread
+from telemetry_log import TelemetryLogWriter, open_log
+from live_plot import LivePlot
+from telemetry_channel import SharedRingBuffer
+from online_stats import RunningStats
+from register_planner import MultiRateReader, telemetry_group, health_groups
 import os
 import time
 import matplotlib.pyplot as plt
@@ -14,67 +27,114 @@ ADDR_PRESENT_CURRENT    = 126   # Present current (2 bytes, signed)
 ADDR_OPERATING_MODE     = 11
 
 PROTOCOL_VERSION        = 2.0
+DXL_MODEL               = "XC330"
 DXL_ID                  = 3
 BAUDRATE                = 57600
 DEVICENAME              = 'com6'
+BROKER                  = None   # address of a running dxl_broker.py, which then owns DEVICENAME
 
 TORQUE_ENABLE           = 1
 TORQUE_DISABLE          = 0
 DEFAULT_POSITION        = 600
 DEFAULT_VELOCITY        = 456
 VELOCITY_UNIT_RPM       = 0.229  # 1 unit = 0.229 rpm
+SAMPLE_RATE_HZ          = 50     # logging rate, paced on absolute deadlines
+HEALTH_RATE_HZ          = 1      # temperature and input voltage, read in spare time of the sampling ticks (0 = off)
+DISPLAY_PERIOD          = 0.1    # console refresh, independent of the sampling rate
+LOG_DIR                 = 'logs'  # one binary telemetry log per recording
+LIVE_PLOT               = True   # blitted RPM/current view while recording
+STATS_ONLY              = False  # keep running statistics only, no log or plots (fixed memory for endurance runs)
+CHANNEL_NAME            = None   # shared-memory name to publish samples on for other processes
+INSTRUMENT              = False  # time every bus call; table printed and saved to LOG_DIR at exit
+MOVE_DURATION           = 1.0    # '0' streams a minimum-jerk move this long; 0 steps straight to the goal
+TRAJECTORY_RATE_HZ      = 50
 # ---------------- Utility for getch ----------------
 if os.name == 'nt':
     import msvcrt
     def getch(): return msvcrt.getch().decode()
+    def kbhit(): return msvcrt.kbhit()
 else:
-    import sys, tty, termios
+    import sys, tty, termios, select
     fd = sys.stdin.fileno()
     old_settings = termios.tcgetattr(fd)
     def getch():
         try:
-            tty.setraw(fd)
+            tty.setraw(fd, termios.TCSANOW)  # don't flush a key kbhit() already saw
             ch = sys.stdin.read(1)
         finally:
             termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
         return ch
+    def kbhit():
+        # Keys are only visible to select() outside line mode; getch() restores it
+        tty.setcbreak(fd, termios.TCSANOW)
+        return bool(select.select([fd], [], [], 0)[0])
+
+# ---------------- Running statistics ----------------
+def new_run_stats():
+    return {"velocity": RunningStats(), "current": RunningStats(), "torque": RunningStats(), "rpm": RunningStats()}
+
+def update_run_stats(stats, records):
+    # velocity in 0.229 rpm units, current in mA
+    stats["velocity"].update_many(records[:, 2])
+    stats["current"].update_many(records[:, 3])
+    stats["torque"].update_many(records[:, 3] * 0.001)  # placeholder: convert mA to Nm (calibrate experimentally)
+    stats["rpm"].update_many(records[:, 2] * VELOCITY_UNIT_RPM)
+
+def print_run_stats(stats):
+    print(stats["velocity"].report(" Velocity"))
+    print(stats["current"].report(" Current ", " mA"))
+    print(stats["torque"].report(" Torque  ", " Nm", precision=3))
+    print(stats["rpm"].report(" RPM     ", " RPM"))
 
 # ---------------- Init ----------------
-portHandler = PortHandler(DEVICENAME)
-packetHandler = PacketHandler(PROTOCOL_VERSION)
+if BROKER:
+    portHandler = BrokerPort(BROKER)
+    packetHandler = BrokerPacketHandler(PROTOCOL_VERSION)
+else:
+    portHandler = PortHandler(DEVICENAME)
+    packetHandler = PacketHandler(PROTOCOL_VERSION)
+if INSTRUMENT:
+    packetHandler = InstrumentedPacketHandler(packetHandler)
+    packetHandler.dump_at_exit(os.path.join(LOG_DIR, "bus_calls.json"))
 
 if not portHandler.openPort():
     print("Failed to open port")
     quit()
-if not portHandler.setBaudRate(BAUDRATE):
-    print("Failed to set baudrate")
+if find_baudrate(portHandler, packetHandler, DXL_ID, BAUDRATE) is None:
+    print(f"DXL ID {DXL_ID} not found at any standard baud rate")
     quit()
 
-# Disable torque before setting mode
-packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_DISABLE)
-packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_OPERATING_MODE, 1)  # Velocity Mode
-packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_ENABLE)
+mirror = RegisterMirror(portHandler, packetHandler, DXL_ID, DXL_MODEL)
+mirror.write_eeprom(ADDR_OPERATING_MODE, 1, 1)  # Velocity Mode
+mirror.write(ADDR_TORQUE_ENABLE, 1, TORQUE_ENABLE)
+
+goal_writer = GoalWriter(portHandler, packetHandler, DXL_ID, DXL_MODEL)
+streamer = TrajectoryStreamer(portHandler, packetHandler, [DXL_ID], ADDR_GOAL_POSITION, 4)
+
+# Health registers are planned into the sampling ticks without stretching them;
+# hardware errors show up in every status packet's error byte
+health = None
+if HEALTH_RATE_HZ:
+    try:
+        health = MultiRateReader(portHandler, packetHandler, DXL_ID, DXL_MODEL,
+                                 [telemetry_group(DXL_MODEL, SAMPLE_RATE_HZ)] +
+                                 health_groups(DXL_MODEL, HEALTH_RATE_HZ, ("voltage", "temperature")))
+    except ValueError as error:
+        print(f"⚠ Health readings off: {error}")
 
 print("  0 → Go to default position")
 print("  1 → Start continuous clockwise rotation + logging")
+print("  s → Print running statistics while recording")
 print("  2/3/other → Stop logging, plot graph and show averages")
 print("  q → Quit")
 
 # ---------------- Data storage ----------------
-time_data = []
-velocity_data = []
-current_data = []
-rpm_data = []
-torque_data = []   # derived from current
+# Samples stream straight to LOG_DIR and plots map the file afterwards; statistics
+# are kept as they arrive, so STATS_ONLY runs need neither
+os.makedirs(LOG_DIR, exist_ok=True)
+# Consumers attach with SharedRingBuffer.attach(CHANNEL_NAME), e.g. python telemetry_channel.py
+channel = SharedRingBuffer(CHANNEL_NAME) if CHANNEL_NAME else None
 recording = False
-start_time = None
-
-def read_signed_2bytes(addr):
-    """Reads a signed 16-bit value"""
-    value, _, _ = packetHandler.read2ByteTxRx(portHandler, DXL_ID, addr)
-    if value > 32767:  # convert unsigned to signed
-        value -= 65536
-    return value
 
 # ---------------- Main loop ----------------
 while True:
@@ -86,98 +146,144 @@ while True:
     elif key == '0':
         print("➡ Going to default position...")
         # Switch to Position Mode
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_DISABLE)
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_OPERATING_MODE, 3)
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_ENABLE)
-        packetHandler.write4ByteTxRx(portHandler, DXL_ID, ADDR_GOAL_POSITION, DEFAULT_POSITION)
+        mirror.write_eeprom(ADDR_OPERATING_MODE, 1, 3)
+        mirror.write(ADDR_TORQUE_ENABLE, 1, TORQUE_ENABLE)
+        start, _, _ = read_telemetry(portHandler, packetHandler, DXL_ID, DXL_MODEL)
+        if start is None or MOVE_DURATION <= 0:
+            goal_writer.write(ADDR_GOAL_POSITION, 4, DEFAULT_POSITION)
+        else:
+            profile = min_jerk([start.position], [DEFAULT_POSITION], MOVE_DURATION, TRAJECTORY_RATE_HZ)
+            print(report(streamer.stream(profile, TRAJECTORY_RATE_HZ)))
 
     elif key == '1':
         print("▶ Starting clockwise rotation and recording...")
         recording = True
-        start_time = time.time()
-        time_data, velocity_data, current_data, torque_data = [], [], [], []
+        log_path = os.path.join(LOG_DIR, time.strftime("trial_%Y%m%d_%H%M%S.dxllog"))
+        log = None if STATS_ONLY else TelemetryLogWriter(log_path)
+        run_stats = new_run_stats()
 
         # Switch to Velocity Mode
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_DISABLE)
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_OPERATING_MODE, 1)
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_ENABLE)
-        packetHandler.write4ByteTxRx(portHandler, DXL_ID, ADDR_GOAL_VELOCITY, DEFAULT_VELOCITY)
+        mirror.write_eeprom(ADDR_OPERATING_MODE, 1, 1)
+        mirror.write(ADDR_TORQUE_ENABLE, 1, TORQUE_ENABLE)
+        goal_writer.write(ADDR_GOAL_VELOCITY, 4, DEFAULT_VELOCITY)
 
-        # Continuous logging until another key is pressed
+        # Continuous logging until another key is pressed. The acquisition
+        # thread owns the port; this loop only drains, prints and checks keys.
+        acquisition = AcquisitionThread(
+            health.read_sample if health else lambda: read_telemetry(portHandler, packetHandler, DXL_ID, DXL_MODEL)[0],
+            SAMPLE_RATE_HZ,
+        )
+        acquisition.start()
+        if LIVE_PLOT:
+            live = LivePlot(acquisition.buffer,
+                            [("velocity", "RPM", VELOCITY_UNIT_RPM), ("effort", "Current (mA)", 1.0)],
+                            window=10 * SAMPLE_RATE_HZ, title="XC330 live")
+        cursor = 0
         while True:
-            if msvcrt.kbhit():  # check if key was pressed
-                stop_key = msvcrt.getch().decode()
-                if stop_key in ['2','3','0','q']:
+            stop_requested = False
+            if kbhit():  # check if key was pressed
+                stop_key = getch()
+                if stop_key == 's':
+                    print_run_stats(run_stats)
+                elif stop_key in ['2','3','0','q']:
                     print("⏹ ing and plotting...")
-                    packetHandler.write4ByteTxRx(portHandler, DXL_ID, ADDR_GOAL_VELOCITY, 0)
-                    recording = False
-                    break
-
-            # Read velocity (ticks per 0.229 rpm unit)
-            vel, _, _ = packetHandler.read4ByteTxRx(portHandler, DXL_ID, ADDR_PRESENT_VELOCITY)
-            if vel > (1 << 31):  # signed conversion
-                vel -= (1 << 32)
-
-            # Read current (mA units)
-            curr = read_signed_2bytes(ADDR_PRESENT_CURRENT)
-            rpm = vel * VELOCITY_UNIT_RPM
-            elapsed = time.time() - start_time
-            torque_est = curr * 0.001  # placeholder: convert mA to Nm (calibrate experimentally)
-
-            time_data.append(elapsed)
-            velocity_data.append(vel)
-            current_data.append(curr)
-            rpm_data.append(rpm)
-            torque_data.append(torque_est)
-
-            print(f"t={elapsed:.2f}s | vel={vel} | current={curr}mA | torque={torque_est:.3f}Nm | rpm={rpm:.2f}")
-            time.sleep(0.1)
+                    acquisition.stop()
+                    stop_requested = True
+
+            records, cursor, dropped = acquisition.buffer.read(cursor)
+            if dropped:
+                print(f"⚠ Logger fell behind, {dropped} samples dropped")
+            if log is not None:
+                log.extend(records)
+            update_run_stats(run_stats, records)
+            if channel is not None:
+                channel.publish(DXL_ID, records)
+
+            if len(records) > 0:
+                # velocity in 0.229 rpm units, current in mA
+                elapsed, _, vel, curr = records[-1]
+                vel, curr = int(vel), int(curr)
+                rpm = vel * VELOCITY_UNIT_RPM
+                torque_est = curr * 0.001  # placeholder: convert mA to Nm (calibrate experimentally)
+                line = f"t={elapsed:.2f}s | vel={vel} | current={curr}mA | torque={torque_est:.3f}Nm | rpm={rpm:.2f}"
+                if health and "temperature" in health.latest:
+                    line += f" | {health.latest['temperature']}°C {health.latest['voltage'] * 0.1:.1f}V"
+                    if health.latest["status_error"]:
+                        line += f" | ⚠ {packetHandler.getRxPacketError(health.latest['status_error'])}"
+                print(line)
+
+            if LIVE_PLOT:
+                live.refresh()
+
+            if stop_requested:
+                goal_writer.write(ADDR_GOAL_VELOCITY, 4, 0)
+                recording = False
+                break
+            time.sleep(DISPLAY_PERIOD)
+
+        if log is not None:
+            log.close()
+            print(f"Log saved to {log_path}")
+        if LIVE_PLOT:
+            live.close()
+        print(acquisition.scheduler.report())
+        if acquisition.errors:
+            print(f"⚠ {acquisition.errors} failed reads")
 
         # ---- Plot results ----
-        if len(time_data) > 0:
-            plt.figure(figsize=(10,6))
-            plt.subplot(2,1,1)
-            plt.plot(time_data, velocity_data, label="Velocity")
-            plt.ylabel("Velocity (ticks)")
-            plt.legend()
-            plt.gca().yaxis.set_major_locator(ticker.MaxNLocator(12))  # More ticks
-            plt.gca().xaxis.set_major_locator(ticker.MaxNLocator(12))
-
-            plt.subplot(2,1,2)
-            plt.plot(time_data, rpm_data, label="RPM", color="blue")
-            plt.xlabel("Time (s)")
-            plt.ylabel("RPM")
-            plt.legend()
-            plt.gca().yaxis.set_major_locator(ticker.MaxNLocator(12))  # More ticks
-            plt.gca().xaxis.set_major_locator(ticker.MaxNLocator(12))
-
-            plt.figure(figsize=(10,6))
-            plt.subplot(2,1,1)
-            plt.plot(time_data, current_data, label="Current", color="orange")
-            plt.ylabel("Current (mA)")
-            plt.legend()
-            plt.gca().yaxis.set_major_locator(ticker.MaxNLocator(12))  # More ticks
-            plt.gca().xaxis.set_major_locator(ticker.MaxNLocator(12))
-
-            plt.subplot(2,1,2)
-            plt.plot(time_data, torque_data, label="Torque (Nm)", color="green")
-            plt.xlabel("Time (s)")
-            plt.ylabel("Torque (Nm)")
-            plt.legend()
-            plt.gca().yaxis.set_major_locator(ticker.MaxNLocator(12))  # More ticks
-            plt.gca().xaxis.set_major_locator(ticker.MaxNLocator(12))            
-            plt.tight_layout()
-            plt.show()
-            print("\nAverages:")
-            print(f" Avg Velocity = {sum(velocity_data)/len(velocity_data):.2f}")
-            print(f" Avg Current = {sum(current_data)/len(current_data):.2f} mA")
-            print(f" Avg Torque  = {sum(torque_data)/len(torque_data):.3f} Nm")
-            print(f" Avg RPM     = {sum(rpm_data)/len(rpm_data):.2f} RPM\n")
-        else:
+        if run_stats["velocity"].count == 0:
             print("⚠ No data collected!")
+        else:
+            if log is not None:
+                run = open_log(log_path)
+                time_data = run["time"]
+                velocity_data = run["velocity"]
+                current_data = run["effort"]
+                rpm_data = velocity_data * VELOCITY_UNIT_RPM
+                torque_data = current_data * 0.001  # placeholder: convert mA to Nm (calibrate experimentally)
+                plt.figure(figsize=(10,6))
+                plt.subplot(2,1,1)
+                plt.plot(time_data, velocity_data, label="Velocity")
+                plt.ylabel("Velocity (ticks)")
+                plt.legend()
+                plt.gca().yaxis.set_major_locator(ticker.MaxNLocator(12))  # More ticks
+                plt.gca().xaxis.set_major_locator(ticker.MaxNLocator(12))
+
+                plt.subplot(2,1,2)
+                plt.plot(time_data, rpm_data, label="RPM", color="blue")
+                plt.xlabel("Time (s)")
+                plt.ylabel("RPM")
+                plt.legend()
+                plt.gca().yaxis.set_major_locator(ticker.MaxNLocator(12))  # More ticks
+                plt.gca().xaxis.set_major_locator(ticker.MaxNLocator(12))
+
+                plt.figure(figsize=(10,6))
+                plt.subplot(2,1,1)
+                plt.plot(time_data, current_data, label="Current", color="orange")
+                plt.ylabel("Current (mA)")
+                plt.legend()
+                plt.gca().yaxis.set_major_locator(ticker.MaxNLocator(12))  # More ticks
+                plt.gca().xaxis.set_major_locator(ticker.MaxNLocator(12))
+
+                plt.subplot(2,1,2)
+                plt.plot(time_data, torque_data, label="Torque (Nm)", color="green")
+                plt.xlabel("Time (s)")
+                plt.ylabel("Torque (Nm)")
+                plt.legend()
+                plt.gca().yaxis.set_major_locator(ticker.MaxNLocator(12))  # More ticks
+                plt.gca().xaxis.set_major_locator(ticker.MaxNLocator(12))            
+                plt.tight_layout()
+                plt.show()
+            print("\nStatistics:")
+            print_run_stats(run_stats)
+            print()
 
 # ---------------- Shutdown ----------------
 packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_DISABLE)
 portHandler.closePort()
+if channel is not None:
+    channel.close()
 print("Torque disabled and port closed.")
+if INSTRUMENT:
+    print(packetHandler.report())
  
\ No newline at end of file
@@ -47,6 +47,7 @@ else:
         return ch
 
 from dynamixel_sdk import *                    # Uses Dynamixel SDK library
+from dxl_telemetry import read_telemetry       # Single-transaction position/speed/load read
 
 # Control table address
 ADDR_MX_TORQUE_ENABLE      = 24               # Control table address is different in Dynamixel model
@@ -55,6 +56,7 @@ ADDR_MX_PRESENT_POSITION   = 36
 
 # Protocol version
 PROTOCOL_VERSION            = 1.0               # See which protocol version is used in the Dynamixel
+DXL_MODEL                   = "RX-10"           # Control table layout used by read_telemetry
 
 # Default setting
 DXL_ID                      = 101                 # Dynamixel ID : 1
@@ -123,14 +125,19 @@ while 1:
         print("%s" % packetHandler.getRxPacketError(dxl_error))
 
     while 1:
-        # Read present position
-        dxl_present_position, dxl_comm_result, dxl_error = packetHandler.read2ByteTxRx(portHandler, DXL_ID, ADDR_MX_PRESENT_POSITION)
+        # Read present position, speed and load
+        telemetry, dxl_comm_result, dxl_error = read_telemetry(portHandler, packetHandler, DXL_ID, DXL_MODEL)
         if dxl_comm_result != COMM_SUCCESS:
             print("%s" % packetHandler.getTxRxResult(dxl_comm_result))
+            continue
         elif dxl_error != 0:
             print("%s" % packetHandler.getRxPacketError(dxl_error))
+        if telemetry is None:
+            print("[ID:%03d] Short status packet, read again" % DXL_ID)
+            continue
 
-        print("[ID:%03d] GoalPos:%03d  PresPos:%03d" % (DXL_ID, dxl_goal_position[index], dxl_present_position))
+        dxl_present_position,dxl_present_speed, dxl_present_load = telemetry
+        print("[ID:%03d] GoalPos:%03d  PresPos:%03d  Speed:%d  Load:%d" % (DXL_ID, dxl_goal_position[index], dxl_present_position, dxl_present_speed, dxl_present_load))
 
         if not abs(dxl_goal_position[index] - dxl_present_position) > DXL_MOVING_STATUS_THRESHOLD:
             break
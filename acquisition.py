@@ -0,0 +1,82 @@
+import threading
+import numpy as np
+from rate_scheduler import RateScheduler
+
+# Fixed record layout written by the acquisition thread
+RECORD_FIELDS = ("time", "position", "velocity", "effort")
+
+
+class RingBuffer:
+    """Preallocated record buffer with one writer and any number of readers.
+
+    The writer only ever advances `written`; each reader keeps its own cursor
+    and drains at its own pace. A reader that falls more than `capacity`
+    records behind loses the oldest ones and is told how many.
+    """
+
+    def __init__(self, capacity, width=len(RECORD_FIELDS)):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, width))
+        self.written = 0
+
+    def append(self, record):
+        self.data[self.written % self.capacity] = record
+        self.written += 1
+
+    def read(self, cursor):
+        """Returns (records newer than cursor, new cursor, number of records dropped)"""
+        end = self.written
+        start = max(cursor, end - self.capacity)
+        if start == end:
+            return self.data[:0], end, start - cursor
+
+        first, last = start % self.capacity, end % self.capacity
+        if first < last:
+            records = self.data[first:last].copy()
+        else:
+            records = np.concatenate((self.data[first:], self.data[:last]))
+
+        # Rows the writer lapped while we were copying may be torn, and so
+        # may the slot it is writing now: record written - capacity
+        overwritten = self.written - self.capacity + 1 - start
+        if overwritten > 0:
+            records = records[overwritten:]
+            start += overwritten
+        return records, end, start - cursor
+
+    def latest(self):
+        """Most recent record, or None before the first write"""
+        if self.written == 0:
+            return None
+        return self.data[(self.written - 1) % self.capacity].copy()
+
+
+class AcquisitionThread(threading.Thread):
+    """Owns the serial loop: samples at a fixed rate into a RingBuffer.
+
+    read_sample() must return a (position, velocity, effort) tuple, or None
+    on a failed transaction. Nothing else should touch the port until stop().
+    """
+
+    def __init__(self, read_sample, rate_hz, capacity=1 << 16):
+        super().__init__(daemon=True)
+        self.read_sample = read_sample
+        self.buffer = RingBuffer(capacity)
+        self.scheduler = RateScheduler(rate_hz)
+        self.errors = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        self.scheduler.start()
+        while not self._stop_event.is_set():
+            t = self.scheduler.wait()
+            sample = self.read_sample()
+            if sample is None:
+                self.errors += 1
+                continue
+            self.buffer.append((t, *sample))
+
+    def stop(self):
+        """Stops sampling and waits for the last transaction to finish"""
+        self._stop_event.set()
+        self.join()
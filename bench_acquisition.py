@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Bus-level benchmark of the acquisition patterns used by the scripts.
+
+Each pattern replays exactly the transactions one sample costs in the named
+script, at every baud rate in BAUDRATES, against the simulated bench (or a
+real port when DEVICENAME is set). Results are printed and saved as JSON.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from dynamixel_sdk import *
+from dxl_sim import SimPortHandler, SimServo
+from dxl_telemetry import read_telemetry
+
+# ---------------- Settings ----------------
+DEVICENAME              = None      # None → simulated bench, or e.g. 'com6' for hardware
+BAUDRATES               = [57600, 1000000]
+SAMPLES                 = 300
+SIM_LATENCY             = 0.0       # extra host latency per status packet (USB latency timer), s
+RESULTS_DIR             = 'bench_results'
+
+
+# ---------------- Patterns ----------------
+# name: (protocol, model, ID, transactions for one sample)
+def data_trials_before(port, ph, dxl_id):
+    return [lambda: ph.read4ByteTxRx(port, dxl_id, 128), lambda: ph.read2ByteTxRx(port, dxl_id, 126)]
+
+
+def data_trials_block(port, ph, dxl_id):
+    return [lambda: read_telemetry(port, ph, dxl_id, "XC330")]
+
+
+def continuous_trial_before(port, ph, dxl_id):
+    return [lambda: ph.read2ByteTxRx(port, dxl_id, 36), lambda: ph.read2ByteTxRx(port, dxl_id, 38)]
+
+
+def continuous_trial_block(port, ph, dxl_id):
+    return [lambda: read_telemetry(port, ph, dxl_id, "AX-12A")]
+
+
+def ax12a_wait_loop(port, ph, dxl_id):
+    return [lambda: ph.read2ByteTxRx(port, dxl_id, 36)]
+
+
+def xc330_monitor_loop(port, ph, dxl_id):
+    return [lambda: ph.read4ByteTxRx(port, dxl_id, 132)]
+
+
+PATTERNS = {
+    "Data_TRIALS.py (velocity + current reads)":        (2.0, "XC330", 3, data_trials_before),
+    "Data_TRIALS.py (block read)":                      (2.0, "XC330", 3, data_trials_block),
+    "Continous_trial_AX_12A.py (position + speed reads)": (1.0, "AX-12A", 101, continuous_trial_before),
+    "Continous_trial_AX_12A.py (block read)":           (1.0, "AX-12A", 101, continuous_trial_block),
+    "AX_12A_Motor_Test.py (position wait loop)":        (1.0, "AX-12A", 101, ax12a_wait_loop),
+    "ros_XC330_T181_T_continuous.py (position monitor)": (2.0, "XC330", 3, xc330_monitor_loop),
+}
+
+
+# ---------------- Measurement ----------------
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_pattern(port, ph, transactions, samples):
+    latencies = []
+    periods = []
+    overheads = []
+    failures = 0
+
+    cpu_start = time.process_time()
+    start = previous = time.perf_counter()
+    for _ in range(samples):
+        bus_time = 0.0
+        for transaction in transactions:
+            t0 = time.perf_counter()
+            result = transaction()
+            latency = time.perf_counter() - t0
+            latencies.append(latency)
+            bus_time += latency
+            if result[1] != COMM_SUCCESS:
+                failures += 1
+        now = time.perf_counter()
+        periods.append(now - previous)
+        overheads.append(now - previous - bus_time)
+        previous = now
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    return {
+        "samples_per_s": samples / elapsed,
+        "transactions_per_s": len(latencies) / elapsed,
+        "latency_p50_ms": percentile(latencies, 0.50) * 1e3,
+        "latency_p99_ms": percentile(latencies, 0.99) * 1e3,
+        "loop_period_mean_ms": statistics.mean(periods) * 1e3,
+        "loop_jitter_ms": statistics.pstdev(periods) * 1e3,
+        "python_overhead_us": statistics.mean(overheads) * 1e6,
+        "cpu_per_sample_us": cpu / samples * 1e6,
+        "failures": failures,
+    }
+
+
+def open_bus(protocol, model, dxl_id, baudrate):
+    """Returns (port, packet handler) with the servo reachable at baudrate, or None"""
+    if DEVICENAME is None:
+        servo = SimServo(dxl_id, model, baudrate=baudrate)
+        port = SimPortHandler("sim", [servo], latency=SIM_LATENCY)
+    else:
+        port = PortHandler(DEVICENAME)
+    ph = PacketHandler(protocol)
+    if not port.openPort() or not port.setBaudRate(baudrate):
+        return None
+    _, dxl_comm_result, _ = ph.ping(port, dxl_id)
+    if dxl_comm_result != COMM_SUCCESS:
+        port.closePort()
+        return None
+    return port, ph
+
+
+if __name__ == "__main__":
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "device": DEVICENAME or "simulated",
+        "samples": SAMPLES,
+        "sim_latency_s": SIM_LATENCY,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": [],
+    }
+
+    for baudrate in BAUDRATES:
+        print(f"\n---------------- {baudrate} baud ----------------")
+        for name, (protocol, model, dxl_id, make_transactions) in PATTERNS.items():
+            bus = open_bus(protocol, model, dxl_id, baudrate)
+            if bus is None:
+                print(f"{name:55s} unreachable")
+                results["runs"].append({"pattern": name, "baudrate": baudrate, "reachable": False})
+                continue
+            port, ph = bus
+            run = run_pattern(port, ph, make_transactions(port, ph, dxl_id), SAMPLES)
+            port.closePort()
+            print(f"{name:55s} {run['samples_per_s']:8.1f} samples/s  {run['transactions_per_s']:8.1f} tx/s  "
+                  f"p50={run['latency_p50_ms']:.2f} ms  p99={run['latency_p99_ms']:.2f} ms  "
+                  f"jitter={run['loop_jitter_ms']:.3f} ms  overhead={run['python_overhead_us']:.1f} us")
+            results["runs"].append({"pattern": name, "baudrate": baudrate, "reachable": True, **run})
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, time.strftime("bench_%Y%m%d_%H%M%S.json"))
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {path}")
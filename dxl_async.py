@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""asyncio front end for the Dynamixel SDK.
+
+The SDK calls block on the serial port, so AsyncBus runs every one of them
+on a single worker thread and hands back awaitables. Transactions from
+concurrent tasks are queued on that thread rather than interleaved on the
+wire. The rest of the program (keyboard, logging, display) stays on the event
+loop. The demo below drives an XC330 from the keyboard while it prints
+telemetry.
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dynamixel_sdk import *
+from dxl_telemetry import MODELS, read_telemetry
+from dxl_register_mirror import RegisterMirror
+from dxl_baud_manager import find_baudrate
+
+# ---------------- Settings ----------------
+ADDR_GOAL_VELOCITY      = 104
+ADDR_OPERATING_MODE     = 11
+
+PROTOCOL_VERSION        = 2.0
+DXL_MODEL               = "XC330"
+DXL_ID                  = 3
+BAUDRATE                = 57600
+DEVICENAME              = 'com6'
+
+DEFAULT_VELOCITY        = 400
+SAMPLE_RATE_HZ          = 50
+DISPLAY_PERIOD          = 0.2
+
+
+class AsyncBus:
+    """Owns one port; every SDK call runs in order on a private worker thread"""
+
+    def __init__(self, portHandler, packetHandler):
+        self.portHandler = portHandler
+        self.packetHandler = packetHandler
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dxl-bus")
+
+    async def call(self, function, *args):
+        """Runs function(*args) on the bus thread and returns its result"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def ping(self, dxl_id):
+        return await self.call(self.packetHandler.ping, self.portHandler, dxl_id)
+
+    async def motor(self, dxl_id, model):
+        # RegisterMirror reads the Status Return Level, so build it on the bus thread too
+        mirror = await self.call(RegisterMirror, self.portHandler, self.packetHandler, dxl_id, model)
+        return AsyncMotor(self, mirror, model)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.portHandler.closePort()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+class AsyncMotor:
+    """Awaitable register access for one servo, through its RegisterMirror"""
+
+    def __init__(self, bus, mirror, model):
+        self.bus = bus
+        self.mirror = mirror
+        self.model = model
+        self.dxl_id = mirror.dxl_id
+
+    async def read(self, address, length):
+        return await self.bus.call(self.mirror.read, address, length)
+
+    async def write(self, address, length, value):
+        return await self.bus.call(self.mirror.write, address, length, value)
+
+    async def write_eeprom(self, address, length, value):
+        return await self.bus.call(self.mirror.write_eeprom, address, length, value)
+
+    async def telemetry(self):
+        """One Telemetry sample, or None if the read failed"""
+        sample, _, _ = await self.bus.call(read_telemetry, self.bus.portHandler, self.bus.packetHandler,
+                                           self.dxl_id, self.model)
+        return sample
+
+    @contextlib.asynccontextmanager
+    async def torque(self):
+        """Torque is on inside the block and switched off however it is left"""
+        address = MODELS[self.model]["ADDR_TORQUE_ENABLE"]
+        await self.write(address, 1, 1)
+        try:
+            yield self
+        finally:
+            await self.write(address, 1, 0)
+
+    async def stream(self, rate_hz):
+        """Yields (perf_counter time, Telemetry) on absolute deadlines.
+
+        Failed reads are skipped. A read that finishes less than a period
+        late is followed straight away; once a whole period has been missed,
+        the missed deadlines are dropped rather than bunched up, as
+        RateScheduler's SKIP policy does.
+        """
+        period = 1.0 / rate_hz
+        deadline = time.perf_counter()
+        while True:
+            sample = await self.telemetry()
+            if sample is not None:
+                yield time.perf_counter(), sample
+            deadline += period
+            late = time.perf_counter() - deadline
+            if late >= period:
+                deadline += (int(late / period) + 1) * period
+            await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+
+
+# ---------------- Keyboard ----------------
+if os.name == 'nt':
+    import msvcrt
+
+    async def key_presses():
+        """Yields key presses without blocking the event loop"""
+        while True:
+            while msvcrt.kbhit():
+                yield msvcrt.getwch()
+            await asyncio.sleep(0.02)
+else:
+    import sys, tty, termios
+
+    async def key_presses():
+        """Yields key presses without blocking the event loop"""
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+        keys = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        tty.setcbreak(fd, termios.TCSANOW)
+        loop.add_reader(fd, lambda: keys.put_nowait(os.read(fd, 1).decode(errors="replace")))
+        try:
+            while True:
+                yield await keys.get()
+        finally:
+            loop.remove_reader(fd)
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+
+
+# ---------------- Demo ----------------
+async def show_telemetry(motor):
+    last_print = 0.0
+    rpm_per_unit = MODELS[motor.model]["rpm_per_unit"]
+    async for t, sample in motor.stream(SAMPLE_RATE_HZ):
+        if t - last_print >= DISPLAY_PERIOD:
+            last_print = t
+            print(f"pos={sample.position}  rpm={sample.velocity * rpm_per_unit:.2f}  current={sample.effort}mA")
+
+
+async def main():
+    portHandler = PortHandler(DEVICENAME)
+    packetHandler = PacketHandler(PROTOCOL_VERSION)
+    if not portHandler.openPort():
+        print("Failed to open port")
+        return
+    if find_baudrate(portHandler, packetHandler, DXL_ID, BAUDRATE) is None:
+        print(f"DXL ID {DXL_ID} not found at any standard baud rate")
+        portHandler.closePort()
+        return
+
+    print("  1 → clockwise   2 → anticlockwise   3 → stop   q → quit")
+    async with AsyncBus(portHandler, packetHandler) as bus:
+        motor = await bus.motor(DXL_ID, DXL_MODEL)
+        await motor.write_eeprom(ADDR_OPERATING_MODE, 1, 1)  # Velocity Mode
+        async with motor.torque():
+            monitor = asyncio.create_task(show_telemetry(motor))
+            async for key in key_presses():
+                if key == 'q':
+                    break
+                elif key == '1':
+                    await motor.write(ADDR_GOAL_VELOCITY, 4, DEFAULT_VELOCITY)
+                elif key == '2':
+                    await motor.write(ADDR_GOAL_VELOCITY, 4, (1 << 32) - DEFAULT_VELOCITY)
+                elif key == '3':
+                    await motor.write(ADDR_GOAL_VELOCITY, 4, 0)
+            monitor.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await monitor
+            await motor.write(ADDR_GOAL_VELOCITY, 4, 0)
+    print("Torque disabled and port closed.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
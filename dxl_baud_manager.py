@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Finds servos across the standard baud rates and moves the bus to the fastest reliable one.
+
+The rate each port/protocol pair was last scanned or upgraded to is stored
+in BUS_CONFIG_FILE. Scripts call find_baudrate() so that a servo moved to
+another rate is still found, instead of every read failing silently.
+"""
+
+import json
+import os
+import time
+from dynamixel_sdk import *
+from dxl_telemetry import MODELS, model_for_number
+from dxl_latency_tuner import write_register
+
+# ---------------- Settings ----------------
+PROTOCOL_VERSION        = 2.0
+DXL_IDS                 = None   # None → scan every ID (slow on Protocol 1.0: no broadcast ping)
+DEVICENAME              = 'com6'
+
+UPGRADE                 = False  # move the bus to the fastest rate that passes the ping burst
+PING_BURST              = 200    # pings per servo when qualifying a rate
+MAX_ERROR_RATE          = 0.0    # highest failed-ping fraction a rate may show
+
+BUS_CONFIG_FILE         = 'dxl_bus.json'
+
+
+# ---------------- Remembered rates ----------------
+def load_bus_config(path=BUS_CONFIG_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def remember_baudrate(port_name, protocol, baudrate, ids, path=BUS_CONFIG_FILE, merge=False):
+    """Stores the bus rate and its IDs; merge adds ids to those already stored at that rate"""
+    config = load_bus_config(path)
+    entry = config.get(port_name, {}).get(str(protocol), {})
+    if merge and entry.get("baudrate") == baudrate:
+        ids = set(ids) | set(entry.get("ids", []))
+    config.setdefault(port_name, {})[str(protocol)] = {"baudrate": baudrate, "ids": sorted(ids)}
+    with open(path, "w") as f:
+        json.dump(config, f, indent=2)
+
+
+def remembered_baudrate(port_name, protocol, path=BUS_CONFIG_FILE):
+    return load_bus_config(path).get(port_name, {}).get(str(protocol), {}).get("baudrate")
+
+
+def standard_baudrates(protocol):
+    """Every rate a model of this protocol can be set to, fastest first"""
+    rates = set()
+    for spec in MODELS.values():
+        if spec["protocol"] == protocol:
+            rates.update(spec["baud_table"].values())
+    return sorted(rates, reverse=True)
+
+
+# ---------------- Scanning ----------------
+def ping_ids(portHandler, packetHandler, ids=None):
+    """Returns {ID: model number} for the servos answering at the port's current rate"""
+    if ids is None and packetHandler.getProtocolVersion() == 2.0:
+        data_list, dxl_comm_result = packetHandler.broadcastPing(portHandler)
+        if dxl_comm_result != COMM_SUCCESS:
+            return {}
+        return {dxl_id: data[0] for dxl_id, data in data_list.items()}
+
+    found = {}
+    for dxl_id in (range(BROADCAST_ID) if ids is None else ids):
+        model_number, dxl_comm_result, _ = packetHandler.ping(portHandler, dxl_id)
+        if dxl_comm_result == COMM_SUCCESS:
+            found[dxl_id] = model_number
+    return found
+
+
+def scan_bus(portHandler, packetHandler, ids=None, baudrates=None):
+    """Pings at every standard rate and returns {baudrate: {ID: model number}}.
+
+    The port is left at the first rate that answered, or unchanged if none did.
+    """
+    original = portHandler.getBaudRate()
+    found = {}
+    for baudrate in baudrates or standard_baudrates(packetHandler.getProtocolVersion()):
+        if not portHandler.setBaudRate(baudrate):
+            continue
+        servos = ping_ids(portHandler, packetHandler, ids)
+        if servos:
+            found[baudrate] = servos
+    portHandler.setBaudRate(next(iter(found), original))
+    return found
+
+
+def find_baudrate(portHandler, packetHandler, dxl_id, preferred=None, remember=False):
+    """Leaves the port at the rate dxl_id answers at and returns it, or None.
+
+    Tries the preferred rate (the scripts pass their BAUDRATE constant),
+    then the one stored in BUS_CONFIG_FILE, then the standard table, so a
+    servo moved to another rate is still found. Only reads the file; with
+    remember=True, dxl_id is also added to the stored IDs at the rate found.
+    """
+    protocol = packetHandler.getProtocolVersion()
+    port_name = portHandler.getPortName()
+    candidates = [preferred, remembered_baudrate(port_name, protocol)] + standard_baudrates(protocol)
+    tried = set()
+    for baudrate in candidates:
+        if baudrate is None or baudrate in tried:
+            continue
+        tried.add(baudrate)
+        if not portHandler.setBaudRate(baudrate):
+            continue
+        _, dxl_comm_result, _ = packetHandler.ping(portHandler, dxl_id)
+        if dxl_comm_result == COMM_SUCCESS:
+            if remember:
+                remember_baudrate(port_name, protocol, baudrate, [dxl_id], merge=True)
+            return baudrate
+    return None
+
+
+# ---------------- Upgrading ----------------
+def ping_error_rate(portHandler, packetHandler, ids, burst=PING_BURST):
+    """Fraction of failed pings over a burst to every ID"""
+    failures = 0
+    for _ in range(burst):
+        for dxl_id in ids:
+            _, dxl_comm_result, _ = packetHandler.ping(portHandler, dxl_id)
+            if dxl_comm_result != COMM_SUCCESS:
+                failures += 1
+    return failures / (burst * len(ids))
+
+
+def move_bus(portHandler, packetHandler, servos, baudrate):
+    """Sets every servo, then the port, to baudrate. Returns True if all of them answer.
+
+    The Baud Rate register is EEPROM, so Protocol 2.0 servos get their torque
+    disabled first and are left that way. Writes go out unacknowledged: a
+    reply, if any, comes back at the old rate and is discarded.
+    """
+    for dxl_id, model in servos:
+        spec = MODELS[model]
+        value = {rate: value for value, rate in spec["baud_table"].items()}[baudrate]
+        if spec["protocol"] == 2.0:
+            write_register(portHandler, packetHandler, dxl_id, spec["ADDR_TORQUE_ENABLE"], 1, 0, acknowledged=False)
+        write_register(portHandler, packetHandler, dxl_id, spec["ADDR_BAUD_RATE"], 1, value, acknowledged=False)
+        time.sleep(0.01)
+        portHandler.clearPort()
+
+    portHandler.setBaudRate(baudrate)
+    return all(packetHandler.ping(portHandler, dxl_id)[1] == COMM_SUCCESS for dxl_id, _ in servos)
+
+
+def upgrade_bus(portHandler, packetHandler, servos, burst=PING_BURST, max_error_rate=MAX_ERROR_RATE):
+    """Steps the bus up through the rates every servo supports while pings stay reliable.
+
+    servos: list of (ID, model) answering at the port's current rate. A rate
+    that loses a servo or exceeds max_error_rate is backed out of and the
+    search stops there. Returns the rate the bus ends at, or None if the
+    servos could not be brought back.
+    """
+    current = portHandler.getBaudRate()
+    common = set.intersection(*(set(MODELS[model]["baud_table"].values()) for _, model in servos))
+    ids = [dxl_id for dxl_id, _ in servos]
+
+    for baudrate in sorted(rate for rate in common if rate > current):
+        if move_bus(portHandler, packetHandler, servos, baudrate) and \
+                ping_error_rate(portHandler, packetHandler, ids, burst) <= max_error_rate:
+            current = baudrate
+            continue
+        if not move_bus(portHandler, packetHandler, servos, current):
+            return None
+        break
+
+    remember_baudrate(portHandler.getPortName(), packetHandler.getProtocolVersion(), current, ids)
+    return current
+
+
+if __name__ == "__main__":
+    portHandler = PortHandler(DEVICENAME)
+    packetHandler = PacketHandler(PROTOCOL_VERSION)
+
+    if not portHandler.openPort():
+        print("Failed to open port")
+        quit()
+
+    found = scan_bus(portHandler, packetHandler, DXL_IDS)
+    if not found:
+        print("No servo answered at any standard baud rate")
+        portHandler.closePort()
+        quit()
+    for baudrate, servos in found.items():
+        print(f"{baudrate:>8d} baud: " + ", ".join(f"ID {dxl_id} (model {model})" for dxl_id, model in servos.items()))
+
+    if len(found) > 1:
+        print("Servos answer at different rates; upgrade only moves the ones at the first rate")
+
+    baudrate, servos = next(iter(found.items()))
+    ids = list(servos)
+    remember_baudrate(DEVICENAME, PROTOCOL_VERSION, baudrate, ids)
+
+    if UPGRADE:
+        # Each servo takes the baud value from its own model's table
+        models = {dxl_id: model_for_number(model_number, PROTOCOL_VERSION) for dxl_id, model_number in servos.items()}
+        unknown = [dxl_id for dxl_id, model in models.items() if model is None]
+        if unknown:
+            # Moving only the known ones would leave the rest behind at the old rate
+            print("Not upgrading: unknown model for " + ", ".join(f"ID {dxl_id} (model {servos[dxl_id]})"
+                                                                    for dxl_id in unknown))
+        else:
+            baudrate = upgrade_bus(portHandler, packetHandler, list(models.items()))
+            if baudrate is None:
+                print("Lost the servos while backing out of a rate; rescan to find them")
+            else:
+                print(f"Bus now at {baudrate} baud")
+    print(f"Saved to {BUS_CONFIG_FILE}")
+
+    portHandler.closePort()
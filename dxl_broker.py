@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Lets several tools share one serial port through a local broker process.
+
+Run this script to open DEVICENAME and serve it on BROKER_ADDRESS. Client
+scripts replace PortHandler/PacketHandler with BrokerPort/BrokerPacketHandler
+and keep calling the usual SDK methods. Every request goes to a single bus
+thread in the broker. Reads that queued up while the previous transaction
+was on the wire are merged per ID into one read covering all the requested
+registers, and each client gets back its own slice. Two tools polling the
+same telemetry block therefore cost one transaction, not two.
+
+The socket is a Unix-domain socket, or a localhost TCP port on systems
+without AF_UNIX (Windows).
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from dynamixel_sdk import *
+from dxl_baud_manager import find_baudrate
+
+# ---------------- Settings ----------------
+PROTOCOL_VERSION        = 2.0
+DXL_ID                  = 3       # servo pinged to find the baud rate
+BAUDRATE                = 57600
+DEVICENAME              = 'com6'
+
+BROKER_ADDRESS          = 'dxl_broker.sock' if hasattr(socket, "AF_UNIX") else '127.0.0.1:47120'
+COALESCE_WINDOW         = 0.0     # extra time to collect requests after the first one, s
+REPORT_PERIOD           = 10.0
+
+
+def _endpoint(address):
+    """(socket family, bind/connect address) for a socket path or 'host:port'"""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, address
+
+
+def _send(conn, message):
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _to_bytes(value, length):
+    return list((value & ((1 << (8 * length)) - 1)).to_bytes(length, "little"))
+
+
+# Integer fields each request op must carry, besides its list of bytes
+REQUEST_FIELDS = {
+    "read": ("id", "address", "length"),
+    "write": ("id", "address"),
+    "write_tx_only": ("id", "address"),
+    "sync_write": ("address", "length"),
+    "ping": ("id",),
+}
+BYTE_FIELDS = {"write": "data", "write_tx_only": "data", "sync_write": "param"}
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _valid(message):
+    """Whether message is a request the bus thread can run"""
+    if not isinstance(message, dict) or message.get("op") not in REQUEST_FIELDS:
+        return False
+    op = message["op"]
+    if not all(_is_int(message.get(field)) and message[field] >= 0 for field in REQUEST_FIELDS[op]):
+        return False
+    if op in BYTE_FIELDS:
+        data = message.get(BYTE_FIELDS[op])
+        return isinstance(data, list) and all(_is_int(value) and 0 <= value <= 255 for value in data)
+    return True
+
+
+def _failure(dxl_comm_result):
+    return {"result": dxl_comm_result, "error": 0, "data": [], "model": 0}
+
+
+# ---------------- Broker ----------------
+class Request:
+    __slots__ = ("message", "reply", "done")
+
+    def __init__(self, message):
+        self.message = message
+        self.reply = None
+        self.done = threading.Event()
+
+
+class BusBroker:
+    """Owns an open port and serves its bus to socket clients.
+
+    Each connection gets a thread that checks each request and forwards it,
+    one at a time, to the bus thread. The bus thread takes every request
+    queued so far (waiting `window` seconds after the first for more) and
+    runs them in arrival order. Only consecutive reads are merged, so a read
+    queued before a write still sees the bus as it was before the write.
+    A request that fails on the bus gets a failed reply; the others in its
+    batch still run.
+    """
+
+    def __init__(self, portHandler, packetHandler, address=BROKER_ADDRESS, window=COALESCE_WINDOW):
+        self.portHandler = portHandler
+        self.packetHandler = packetHandler
+        self.address = address
+        self.window = window
+        self.requests = queue.Queue()
+        self.request_count = 0
+        self.transactions = 0
+        self.clients = 0
+        self.hello = {
+            "port": portHandler.getPortName(),
+            "protocol": packetHandler.getProtocolVersion(),
+            "baudrate": portHandler.getBaudRate(),
+        }
+
+    # -------- bus thread --------
+    def _collect(self):
+        batch = [self.requests.get()]
+        if batch[0] is None:
+            return None
+        deadline = time.perf_counter() + self.window
+        while True:
+            try:
+                timeout = deadline - time.perf_counter()
+                request = self.requests.get(timeout=timeout) if timeout > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                return batch
+            if request is None:
+                self.requests.put(None)     # finish this batch, stop on the next
+                return batch
+            batch.append(request)
+
+    def _transact(self, message):
+        port, packet = self.portHandler, self.packetHandler
+        op = message["op"]
+        self.transactions += 1
+        if op == "write":
+            dxl_comm_result, dxl_error = packet.writeTxRx(port, message["id"], message["address"],
+                                                         len(message["data"]), message["data"])
+            return {"result": dxl_comm_result, "error": dxl_error}
+        if op == "write_tx_only":
+            dxl_comm_result = packet.writeTxOnly(port, message["id"], message["address"],
+                                                 len(message["data"]), message["data"])
+            return {"result": dxl_comm_result, "error": 0}
+        if op == "sync_write":
+            dxl_comm_result = packet.syncWriteTxOnly(port, message["address"], message["length"],
+                                                     message["param"], len(message["param"]))
+            return {"result": dxl_comm_result, "error": 0}
+        model_number, dxl_comm_result, dxl_error = packet.ping(port, message["id"])
+        return {"model": model_number, "result": dxl_comm_result, "error": dxl_error}
+
+    def _read_span(self, dxl_id, span):
+        """One read from the lowest to the highest register in span, sliced per request"""
+        start = span[0].message["address"]
+        end = max(request.message["address"] + request.message["length"] for request in span)
+        data, dxl_comm_result, dxl_error = self.packetHandler.readTxRx(self.portHandler, dxl_id, start, end - start)
+        self.transactions += 1
+        for request in span:
+            offset = request.message["address"] - start
+            request.reply = {"data": data[offset:offset + request.message["length"]],
+                             "result": dxl_comm_result, "error": dxl_error}
+
+    def _read_spans(self, reads):
+        for dxl_id, pending in reads.items():
+            pending.sort(key=lambda request: request.message["address"])
+            span = [pending[0]]
+            end = pending[0].message["address"] + pending[0].message["length"]
+            for request in pending[1:]:
+                # Overlapping or adjacent ranges share a read; a gap starts a new one
+                if request.message["address"] > end:
+                    self._run_span(dxl_id, span)
+                    span = []
+                span.append(request)
+                end = max(end, request.message["address"] + request.message["length"])
+            self._run_span(dxl_id, span)
+
+    def _run_span(self, dxl_id, span):
+        try:
+            self._read_span(dxl_id, span)
+        except Exception as error:
+            print(f"⚠ read of ID {dxl_id} failed: {error!r}")
+            for request in span:
+                request.reply = _failure(COMM_RX_CORRUPT)
+
+    def _execute(self, batch):
+        reads = {}
+        try:
+            for request in batch:
+                if request.message["op"] == "read":
+                    reads.setdefault(request.message["id"], []).append(request)
+                    continue
+                # Any other request ends the run of reads queued before it, which go out first
+                self._read_spans(reads)
+                reads = {}
+                try:
+                    request.reply = self._transact(request.message)
+                except Exception as error:
+                    print(f"⚠ {request.message['op']} failed: {error!r}")
+                    request.reply = _failure(COMM_TX_FAIL)
+            self._read_spans(reads)
+        finally:
+            for request in batch:
+                if request.reply is None:
+                    request.reply = _failure(COMM_NOT_AVAILABLE)
+                request.done.set()
+
+    def _bus_loop(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            self.request_count += len(batch)
+            try:
+                self._execute(batch)
+            except Exception as error:
+                print(f"⚠ batch of {len(batch)} request(s) failed: {error!r}")
+
+    # -------- client threads --------
+    def _serve_client(self, conn):
+        self.clients += 1
+        try:
+            _send(conn, self.hello)
+            for line in conn.makefile("rb"):
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None
+                if not _valid(message):
+                    _send(conn, _failure(COMM_NOT_AVAILABLE))
+                    continue
+                request = Request(message)
+                self.requests.put(request)
+                request.done.wait()
+                _send(conn, request.reply)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.clients -= 1
+            conn.close()
+
+    def serve_forever(self, report_period=REPORT_PERIOD):
+        family, endpoint = _endpoint(self.address)
+        if family == socket.AF_UNIX and os.path.exists(endpoint):
+            os.unlink(endpoint)     # left behind by a broker that was killed
+        server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(endpoint)
+        server.listen()
+        server.settimeout(report_period)
+
+        bus = threading.Thread(target=self._bus_loop, daemon=True, name="dxl-broker-bus")
+        bus.start()
+        print(f"Serving {self.hello['port']} @ {self.hello['baudrate']} on {self.address}")
+        try:
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    print(self.report())
+                    continue
+                threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+        finally:
+            server.close()
+            if family == socket.AF_UNIX:
+                os.unlink(endpoint)
+            self.requests.put(None)
+            bus.join()
+
+    def report(self):
+        saved = self.request_count - self.transactions
+        return (f"{self.clients} client(s) | {self.request_count} requests in {self.transactions} transactions "
+                f"({saved} coalesced)")
+
+
+# ---------------- Client ----------------
+class BrokerPort:
+    """Stands in for PortHandler: a connection to a running broker.
+
+    The broker owns the real port, so setBaudRate() only succeeds for the
+    rate the broker is already running at; find_baudrate() still works.
+    """
+
+    def __init__(self, address=BROKER_ADDRESS):
+        self.address = address
+        self.sock = None
+        self.lock = threading.Lock()
+        self.hello = {}
+
+    def openPort(self):
+        family, endpoint = _endpoint(self.address)
+        try:
+            self.sock = socket.socket(family, socket.SOCK_STREAM)
+            self.sock.connect(endpoint)
+        except OSError:
+            self.sock = None
+            return False
+        self.reader = self.sock.makefile("rb")
+        self.hello = json.loads(self.reader.readline())
+        return True
+
+    def closePort(self):
+        if self.sock is not None:
+            self.reader.close()
+            self.sock.close()
+            self.sock = None
+
+    def getPortName(self):
+        return self.hello.get("port", self.address)
+
+    def getBaudRate(self):
+        return self.hello.get("baudrate")
+
+    def setBaudRate(self, baudrate):
+        return baudrate == self.getBaudRate()
+
+    def clearPort(self):
+        pass
+
+    def request(self, message):
+        """Sends one request and returns the broker's reply dict"""
+        with self.lock:
+            try:
+                _send(self.sock, message)
+                line = self.reader.readline()
+            except (OSError, AttributeError):
+                line = b""
+        if not line:
+            return {"result": COMM_PORT_BUSY, "error": 0, "data": [], "model": 0}
+        return json.loads(line)
+
+
+class BrokerPacketHandler:
+    """The PacketHandler calls the scripts use, forwarded through a BrokerPort"""
+
+    def __init__(self, protocol_version):
+        self.packetHandler = PacketHandler(protocol_version)    # error strings only
+
+    def getProtocolVersion(self):
+        return self.packetHandler.getProtocolVersion()
+
+    def getTxRxResult(self, result):
+        return self.packetHandler.getTxRxResult(result)
+
+    def getRxPacketError(self, error):
+        return self.packetHandler.getRxPacketError(error)
+
+    def ping(self, port, dxl_id):
+        reply = port.request({"op": "ping", "id": dxl_id})
+        return reply.get("model", 0), reply["result"], reply["error"]
+
+    def readTxRx(self, port, dxl_id, address, length):
+        reply = port.request({"op": "read", "id": dxl_id, "address": address, "length": length})
+        return reply.get("data", []), reply["result"], reply["error"]
+
+    def _read_value(self, port, dxl_id, address, length):
+        data, dxl_comm_result, dxl_error = self.readTxRx(port, dxl_id, address, length)
+        value = int.from_bytes(bytes(data), "little") if dxl_comm_result == COMM_SUCCESS else 0
+        return value, dxl_comm_result, dxl_error
+
+    def read1ByteTxRx(self, port, dxl_id, address):
+        return self._read_value(port, dxl_id, address, 1)
+
+    def read2ByteTxRx(self, port, dxl_id, address):
+        return self._read_value(port, dxl_id, address, 2)
+
+    def read4ByteTxRx(self, port, dxl_id, address):
+        return self._read_value(port, dxl_id, address, 4)
+
+    def writeTxRx(self, port, dxl_id, address, length, data):
+        reply = port.request({"op": "write", "id": dxl_id, "address": address, "data": list(data[:length])})
+        return reply["result"], reply["error"]
+
+    def writeTxOnly(self, port, dxl_id, address, length, data):
+        return port.request({"op": "write_tx_only", "id": dxl_id, "address": address,
+                             "data": list(data[:length])})["result"]
+
+    def write1ByteTxRx(self, port, dxl_id, address, value):
+        return self.writeTxRx(port, dxl_id, address, 1, _to_bytes(value, 1))
+
+    def write2ByteTxRx(self, port, dxl_id, address, value):
+        return self.writeTxRx(port, dxl_id, address, 2, _to_bytes(value, 2))
+
+    def write4ByteTxRx(self, port, dxl_id, address, value):
+        return self.writeTxRx(port, dxl_id, address, 4, _to_bytes(value, 4))
+
+    def write1ByteTxOnly(self, port, dxl_id, address, value):
+        return self.writeTxOnly(port, dxl_id, address, 1, _to_bytes(value, 1))
+
+    def write2ByteTxOnly(self, port, dxl_id, address, value):
+        return self.writeTxOnly(port, dxl_id, address, 2, _to_bytes(value, 2))
+
+    def write4ByteTxOnly(self, port, dxl_id, address, value):
+        return self.writeTxOnly(port, dxl_id, address, 4, _to_bytes(value, 4))
+
+    def syncWriteTxOnly(self, port, start_address, data_length, param, param_length):
+        return port.request({"op": "sync_write", "address": start_address, "length": data_length,
+                             "param": list(param[:param_length])})["result"]
+
+
+if __name__ == "__main__":
+    portHandler = PortHandler(DEVICENAME)
+    packetHandler = PacketHandler(PROTOCOL_VERSION)
+    if not portHandler.openPort():
+        print("Failed to open port")
+        quit()
+    if find_baudrate(portHandler, packetHandler, DXL_ID, BAUDRATE) is None:
+        print(f"DXL ID {DXL_ID} not found at any standard baud rate")
+        quit()
+
+    broker = BusBroker(portHandler, packetHandler)
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(broker.report())
+    portHandler.closePort()
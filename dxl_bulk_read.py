@@ -0,0 +1,106 @@
+from dynamixel_sdk import *
+from dxl_telemetry import MODELS
+import time
+
+
+class BulkTelemetry:
+    """Samples a mixed Protocol 1.0 chain with one Bulk Read (0x92) per tick.
+
+    Each servo is read over its own model's present-state block. Servos whose
+    model does not answer Bulk Read (AX-12A, RX-10) are read back to back with
+    readTxRx after the bulk transaction, so the per-tick cost stays fixed.
+    """
+
+    def __init__(self, portHandler, packetHandler, servos):
+        """servos: list of (dxl_id, model) pairs"""
+        self.portHandler = portHandler
+        self.packetHandler = packetHandler
+        self.servos = []
+        self.bulk_servos = []
+        self.sequential_servos = []
+        self.param = []
+
+        for dxl_id, model in servos:
+            spec = MODELS[model]
+            if spec["protocol"] != 1.0:
+                raise ValueError(f"Bulk Read chain needs Protocol 1.0 models, got {model}")
+            entry = (len(self.servos), dxl_id, spec)
+            self.servos.append((dxl_id, model))
+            if spec["bulk_read"]:
+                self.bulk_servos.append(entry)
+                # Protocol 1.0 bulk parameter: LENGTH, ID, START_ADDRESS
+                self.param.extend([spec["block_length"], dxl_id, spec["block_start"]])
+            else:
+                self.sequential_servos.append(entry)
+
+    def _read_bulk(self, samples):
+        # Issued directly on the packet handler: GroupBulkRead in some SDK
+        # releases passes a Protocol 2.0 argument list to the 1.0 handler.
+        dxl_comm_result = self.packetHandler.bulkReadTx(self.portHandler, self.param, len(self.param))
+        if dxl_comm_result != COMM_SUCCESS:
+            return dxl_comm_result
+
+        # Status packets come back in request order and share one timeout
+        for index, dxl_id, spec in self.bulk_servos:
+            data, dxl_comm_result, _ = self.packetHandler.readRx(self.portHandler, dxl_id, spec["block_length"])
+            if dxl_comm_result != COMM_SUCCESS:
+                return dxl_comm_result
+            samples[index] = spec["decode"](data)
+        return COMM_SUCCESS
+
+    def read(self):
+        """Reads every servo once.
+
+        Returns (list of Telemetry or None in servo order, dxl_comm_result of
+        the first failed transaction or COMM_SUCCESS).
+        """
+        samples = [None] * len(self.servos)
+        result = COMM_SUCCESS
+
+        if self.bulk_servos:
+            result = self._read_bulk(samples)
+
+        for index, dxl_id, spec in self.sequential_servos:
+            data, dxl_comm_result, _ = self.packetHandler.readTxRx(
+                self.portHandler, dxl_id, spec["block_start"], spec["block_length"]
+            )
+            if dxl_comm_result == COMM_SUCCESS:
+                samples[index] = spec["decode"](data)
+            elif result == COMM_SUCCESS:
+                result = dxl_comm_result
+
+        return samples, result
+
+
+if __name__ == "__main__":
+    # ---------------- Settings ----------------
+    PROTOCOL_VERSION        = 1.0
+    DXL_SERVOS              = [(101, "AX-12A"), (1, "RX-10")]
+    BAUDRATE                = 1000000
+    DEVICENAME              = 'com6'
+    SAMPLES                 = 200
+
+    portHandler = PortHandler(DEVICENAME)
+    packetHandler = PacketHandler(PROTOCOL_VERSION)
+
+    if not portHandler.openPort():
+        print("Failed to open port")
+        quit()
+    if not portHandler.setBaudRate(BAUDRATE):
+        print("Failed to set baudrate")
+        quit()
+
+    telemetry = BulkTelemetry(portHandler, packetHandler, DXL_SERVOS)
+    failures = 0
+    start_time = time.perf_counter()
+    for _ in range(SAMPLES):
+        samples, dxl_comm_result = telemetry.read()
+        if dxl_comm_result != COMM_SUCCESS:
+            failures += 1
+    elapsed = time.perf_counter() - start_time
+
+    for (dxl_id, model), sample in zip(DXL_SERVOS, samples):
+        print(f"[ID:{dxl_id} {model}] {sample}")
+    print(f"{SAMPLES / elapsed:.1f} ticks/s, {failures} failed, "
+          f"{len(telemetry.bulk_servos)} bulk / {len(telemetry.sequential_servos)} sequential")
+    portHandler.closePort()
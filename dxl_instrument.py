@@ -0,0 +1,133 @@
+import atexit
+import json
+import os
+import time
+from dynamixel_sdk import *
+
+# PacketHandler methods that never touch the bus are passed through untimed
+UNTIMED = {"getProtocolVersion", "getTxRxResult", "getRxPacketError", "updateCRC", "addStuffing", "removeStuffing"}
+# Calls that address the whole bus rather than the ID in their second argument
+BUS_CALLS = ("sync", "bulk", "fast", "broadcast", "txPacket", "rxPacket", "txRxPacket")
+
+BUCKETS = 32    # bucket i counts latencies in [2^(i-1), 2^i) microseconds
+
+
+def split_result(value):
+    """(dxl_comm_result, dxl_error) out of any SDK return shape"""
+    if isinstance(value, int):
+        return value, 0
+    if len(value) == 3:
+        return value[1], value[2]
+    if isinstance(value[0], int):
+        return value[0], value[1]
+    return value[1], 0      # broadcastPing: (data, result)
+
+
+class CallStats:
+    """Counters and a log2 latency histogram for one (call, ID) pair"""
+
+    __slots__ = ("calls", "total_ns", "max_ns", "comm_errors", "hardware_errors", "histogram")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.comm_errors = 0
+        self.hardware_errors = 0
+        self.histogram = [0] * BUCKETS
+
+    def percentile(self, q):
+        """Upper edge, in seconds, of the histogram bucket holding the q-th latency (capped at the max)"""
+        target = q * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= target:
+                return min((1 << bucket) * 1e-6, self.max_ns * 1e-9)
+        return 0.0
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "total_s": self.total_ns * 1e-9,
+            "mean_ms": self.total_ns / self.calls * 1e-6 if self.calls else 0.0,
+            "p50_ms": self.percentile(0.50) * 1e3,
+            "p99_ms": self.percentile(0.99) * 1e3,
+            "max_ms": self.max_ns * 1e-6,
+            "comm_errors": self.comm_errors,
+            "hardware_errors": self.hardware_errors,
+            "histogram_us_log2": self.histogram,
+        }
+
+
+class InstrumentedPacketHandler:
+    """Times every bus call made through a PacketHandler.
+
+    Drop-in replacement: wrap once, pass the wrapper wherever the packet
+    handler went, including GroupSyncRead and friends. Each call costs two
+    perf_counter_ns() reads and a few integer updates. stats() and report()
+    can be called at any time; dump() writes JSON.
+    """
+
+    def __init__(self, packetHandler):
+        self.packetHandler = packetHandler
+        self.calls = {}         # (method, ID or None) -> CallStats
+
+    def __getattr__(self, name):
+        method = getattr(self.packetHandler, name)
+        if name in UNTIMED or not callable(method):
+            return method
+        bus_call = name.startswith(BUS_CALLS)
+        calls = self.calls
+        clock = time.perf_counter_ns
+
+        def timed(*args):
+            t0 = clock()
+            value = method(*args)
+            elapsed = clock() - t0
+
+            key = (name, None if bus_call or len(args) < 2 else args[1])
+            entry = calls.get(key)
+            if entry is None:
+                entry = calls[key] = CallStats()
+            entry.calls += 1
+            entry.total_ns += elapsed
+            if elapsed > entry.max_ns:
+                entry.max_ns = elapsed
+            entry.histogram[min(BUCKETS - 1, (elapsed // 1000).bit_length())] += 1
+
+            dxl_comm_result, dxl_error = split_result(value)
+            if dxl_comm_result != COMM_SUCCESS:
+                entry.comm_errors += 1
+            elif dxl_error:
+                entry.hardware_errors += 1
+            return value
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, timed)
+        return timed
+
+    def stats(self):
+        """[(method, ID, stats dict)] sorted by total time spent, largest first"""
+        rows = [(name, dxl_id, entry.as_dict()) for (name, dxl_id), entry in self.calls.items()]
+        return sorted(rows, key=lambda row: row[2]["total_s"], reverse=True)
+
+    def reset(self):
+        self.calls.clear()
+
+    def report(self, top=20):
+        lines = [f"{'call':22s} {'ID':>4s} {'calls':>7s} {'total s':>8s} {'mean ms':>8s} "
+                 f"{'p50 ms':>7s} {'p99 ms':>7s} {'max ms':>7s} {'comm':>5s} {'hw':>4s}"]
+        for name, dxl_id, s in self.stats()[:top]:
+            lines.append(f"{name:22s} {'bus' if dxl_id is None else dxl_id:>4} {s['calls']:7d} {s['total_s']:8.3f} "
+                         f"{s['mean_ms']:8.3f} {s['p50_ms']:7.3f} {s['p99_ms']:7.3f} {s['max_ms']:7.3f} "
+                         f"{s['comm_errors']:5d} {s['hardware_errors']:4d}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump([{"call": name, "id": dxl_id, **s} for name, dxl_id, s in self.stats()], f, indent=2)
+
+    def dump_at_exit(self, path):
+        atexit.register(self.dump, path)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Measures and minimises per-ID round-trip latency.
+
+Every servo on the bus has its round trip measured with its current
+settings. Return Delay Time and Status Return Level are then written for the
+fastest replies, and the servo is measured again. The servo keeps these
+EEPROM settings, so the tool only has to run once per servo.
+"""
+
+import statistics
+import time
+from dynamixel_sdk import *
+from dxl_telemetry import MODELS
+
+# ---------------- Settings ----------------
+PROTOCOL_VERSION        = 2.0
+DXL_MODEL               = "XC330"
+DXL_IDS                 = [3]
+BAUDRATE                = 57600
+DEVICENAME              = 'com6'
+
+RETURN_DELAY            = 0      # 2 us units; factory default is 250 (500 us)
+# 2 = answer everything, 1 = reads and ping only, 0 = ping only. Below 2, every plain
+# write*ByteTxRx in the scripts waits out the packet timeout; only lower it for
+# servos whose scripts write through GoalWriter / RegisterMirror alone
+STATUS_RETURN_LEVEL     = 2
+SAMPLES                 = 200
+
+# Status Return Level 2 is the only level at which writes are acknowledged
+STATUS_ALL = 2
+
+WRITE_TX_ONLY = {1: "write1ByteTxOnly", 2: "write2ByteTxOnly", 4: "write4ByteTxOnly"}
+WRITE_TX_RX = {1: "write1ByteTxRx", 2: "write2ByteTxRx", 4: "write4ByteTxRx"}
+
+
+def write_register(portHandler, packetHandler, dxl_id, address, length, value, acknowledged=True):
+    """Writes a 1/2/4-byte register, waiting for the status packet only when acknowledged.
+
+    Returns (dxl_comm_result, dxl_error); dxl_error is 0 for unacknowledged writes.
+    """
+    if acknowledged:
+        return getattr(packetHandler, WRITE_TX_RX[length])(portHandler, dxl_id, address, value)
+    return getattr(packetHandler, WRITE_TX_ONLY[length])(portHandler, dxl_id, address, value), 0
+
+
+class GoalWriter:
+    """Hot-path register writes matched to the servo's Status Return Level.
+
+    The level is read once, at construction. Below level 2 (an opt-in of
+    dxl_latency_tuner.py, see STATUS_RETURN_LEVEL) the servo never answers a
+    write. Goal writes then go out TxOnly, because a TxRx write would wait
+    for the packet timeout. At level 2, the factory default, they stay TxRx.
+    An unread status packet would otherwise arrive during the next read and
+    be taken as its reply.
+    """
+
+    def __init__(self, portHandler, packetHandler, dxl_id, model):
+        self.portHandler = portHandler
+        self.packetHandler = packetHandler
+        self.dxl_id = dxl_id
+        level, dxl_comm_result, _ = packetHandler.read1ByteTxRx(
+            portHandler, dxl_id, MODELS[model]["ADDR_STATUS_RETURN_LEVEL"]
+        )
+        self.acknowledged = dxl_comm_result != COMM_SUCCESS or level >= STATUS_ALL
+
+    def write(self, address, length, value):
+        return write_register(self.portHandler, self.packetHandler, self.dxl_id,
+                              address, length, value, self.acknowledged)
+
+
+def measure_round_trip(portHandler, packetHandler, dxl_id, model, samples=SAMPLES):
+    """Times telemetry block reads and LED writes against one servo.
+
+    Writes use TxRx while the servo acknowledges them and TxOnly otherwise,
+    so the write figure is the time the host actually spends per write.
+    """
+    spec = MODELS[model]
+    level, dxl_comm_result, _ = packetHandler.read1ByteTxRx(portHandler, dxl_id, spec["ADDR_STATUS_RETURN_LEVEL"])
+    if dxl_comm_result != COMM_SUCCESS:
+        return None
+    acknowledged = level >= STATUS_ALL
+    led, _, _ = packetHandler.read1ByteTxRx(portHandler, dxl_id, spec["ADDR_LED"])
+
+    reads = []
+    writes = []
+    failures = 0
+    for _ in range(samples):
+        t0 = time.perf_counter()
+        _, dxl_comm_result, _ = packetHandler.readTxRx(portHandler, dxl_id, spec["block_start"], spec["block_length"])
+        reads.append(time.perf_counter() - t0)
+        if dxl_comm_result != COMM_SUCCESS:
+            failures += 1
+
+        # Rewriting the current LED state is harmless and exercises the write path
+        t0 = time.perf_counter()
+        dxl_comm_result, _ = write_register(portHandler, packetHandler, dxl_id, spec["ADDR_LED"], 1, led, acknowledged)
+        writes.append(time.perf_counter() - t0)
+        if dxl_comm_result != COMM_SUCCESS:
+            failures += 1
+
+    reads.sort()
+    return {
+        "status_return_level": level,
+        "read_p50_ms": statistics.median(reads) * 1e3,
+        "read_p99_ms": reads[min(len(reads) - 1, int(0.99 * len(reads)))] * 1e3,
+        "write_mean_ms": statistics.mean(writes) * 1e3,
+        "failures": failures,
+    }
+
+
+def configure_latency(portHandler, packetHandler, dxl_id, model,
+                      return_delay=RETURN_DELAY, status_return_level=STATUS_RETURN_LEVEL):
+    """Writes Return Delay Time and Status Return Level, skipping registers already set.
+
+    Both registers are EEPROM, which Protocol 2.0 servos lock while torque is
+    on. Torque is therefore switched off for the writes and restored afterwards.
+    Returns True once a read-back confirms both values.
+    """
+    spec = MODELS[model]
+    delay, dxl_comm_result, _ = packetHandler.read1ByteTxRx(portHandler, dxl_id, spec["ADDR_RETURN_DELAY"])
+    if dxl_comm_result != COMM_SUCCESS:
+        return False
+    level, _, _ = packetHandler.read1ByteTxRx(portHandler, dxl_id, spec["ADDR_STATUS_RETURN_LEVEL"])
+    if delay == return_delay and level == status_return_level:
+        return True
+
+    acknowledged = level >= STATUS_ALL
+    torque, _, _ = packetHandler.read1ByteTxRx(portHandler, dxl_id, spec["ADDR_TORQUE_ENABLE"])
+    if torque:
+        write_register(portHandler, packetHandler, dxl_id, spec["ADDR_TORQUE_ENABLE"], 1, 0, acknowledged)
+    if delay != return_delay:
+        write_register(portHandler, packetHandler, dxl_id, spec["ADDR_RETURN_DELAY"], 1, return_delay, acknowledged)
+    if level != status_return_level:
+        # Whether this very write is answered depends on firmware: send it
+        # unacknowledged and drop any reply before the next transaction
+        write_register(portHandler, packetHandler, dxl_id, spec["ADDR_STATUS_RETURN_LEVEL"], 1, status_return_level,
+                       acknowledged=False)
+        time.sleep(0.01)
+        portHandler.clearPort()
+        acknowledged = status_return_level >= STATUS_ALL
+    if torque:
+        write_register(portHandler, packetHandler, dxl_id, spec["ADDR_TORQUE_ENABLE"], 1, torque, acknowledged)
+
+    delay, dxl_comm_result, _ = packetHandler.read1ByteTxRx(portHandler, dxl_id, spec["ADDR_RETURN_DELAY"])
+    level, _, _ = packetHandler.read1ByteTxRx(portHandler, dxl_id, spec["ADDR_STATUS_RETURN_LEVEL"])
+    return dxl_comm_result == COMM_SUCCESS and delay == return_delay and level == status_return_level
+
+
+def print_round_trip(label, run):
+    print(f"  {label:7s} level={run['status_return_level']}  read p50={run['read_p50_ms']:.2f} ms  "
+          f"p99={run['read_p99_ms']:.2f} ms  write={run['write_mean_ms']:.2f} ms  failures={run['failures']}")
+
+
+if __name__ == "__main__":
+    portHandler = PortHandler(DEVICENAME)
+    packetHandler = PacketHandler(PROTOCOL_VERSION)
+
+    if not portHandler.openPort() or not portHandler.setBaudRate(BAUDRATE):
+        print("Failed to open port or set baudrate")
+        quit()
+
+    for dxl_id in DXL_IDS:
+        before = measure_round_trip(portHandler, packetHandler, dxl_id, DXL_MODEL)
+        if before is None:
+            print(f"[ID:{dxl_id:03d}] no response")
+            continue
+        print(f"[ID:{dxl_id:03d}] {DXL_MODEL}")
+        print_round_trip("before", before)
+
+        if not configure_latency(portHandler, packetHandler, dxl_id, DXL_MODEL):
+            print("  Failed to configure Return Delay Time / Status Return Level")
+            continue
+        print_round_trip("after", measure_round_trip(portHandler, packetHandler, dxl_id, DXL_MODEL))
+
+    portHandler.closePort()
@@ -0,0 +1,106 @@
+from dynamixel_sdk import *
+from dxl_telemetry import MODELS
+from dxl_latency_tuner import STATUS_ALL, write_register
+
+READ_TX_RX = {1: "read1ByteTxRx", 2: "read2ByteTxRx", 4: "read4ByteTxRx"}
+
+
+class RegisterMirror:
+    """Write-through copy of the registers written to or read from one servo.
+
+    Writing the value a register already holds is answered from the mirror
+    without a transaction. Any failed transaction or status error clears the
+    whole mirror: a servo that stopped answering may have browned out and
+    come back with its RAM at defaults. So does reboot(). Torque Enable is
+    never mirrored: the servo clears it on its own after an overload or
+    overheating shutdown, and writes made elsewhere (GoalWriter, other
+    tools) would not see that, so torque writes always go out.
+    """
+
+    def __init__(self, portHandler, packetHandler, dxl_id, model):
+        self.portHandler = portHandler
+        self.packetHandler = packetHandler
+        self.dxl_id = dxl_id
+        self.spec = MODELS[model]
+        self.values = {}        # address -> (length, value)
+        self.volatile = {self.spec["ADDR_TORQUE_ENABLE"]}     # changed by the servo itself
+        self.transactions = 0
+        self.skipped = 0
+
+        level, dxl_comm_result, dxl_error = self.read(self.spec["ADDR_STATUS_RETURN_LEVEL"], 1)
+        self.acknowledged = dxl_comm_result != COMM_SUCCESS or level >= STATUS_ALL
+
+    def invalidate(self, address=None, length=1):
+        """Forgets every register overlapping address..address+length, or all of them"""
+        if address is None:
+            self.values.clear()
+            return
+        for start, (size, _) in list(self.values.items()):
+            if start < address + length and address < start + size:
+                del self.values[start]
+
+    def cached(self, address, length):
+        entry = self.values.get(address)
+        return entry[1] if entry is not None and entry[0] == length else None
+
+    def _record(self, address, length, value, dxl_comm_result, dxl_error):
+        self.transactions += 1
+        if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
+            self.invalidate()
+        else:
+            self.invalidate(address, length)
+            if address not in self.volatile:
+                self.values[address] = (length, value)
+
+    def read(self, address, length):
+        """Reads a register from the servo (never from the mirror) and records it"""
+        value, dxl_comm_result, dxl_error = getattr(self.packetHandler, READ_TX_RX[length])(
+            self.portHandler, self.dxl_id, address
+        )
+        self._record(address, length, value, dxl_comm_result, dxl_error)
+        return value, dxl_comm_result, dxl_error
+
+    def value(self, address, length):
+        """Mirrored value, read from the servo on a miss"""
+        value = self.cached(address, length)
+        if value is None:
+            value, dxl_comm_result, _ = self.read(address, length)
+            if dxl_comm_result != COMM_SUCCESS:
+                return None
+        return value
+
+    def write(self, address, length, value):
+        """Writes unless the mirror already holds value. Returns (dxl_comm_result, dxl_error)."""
+        if self.cached(address, length) == value:
+            self.skipped += 1
+            return COMM_SUCCESS, 0
+        dxl_comm_result, dxl_error = write_register(self.portHandler, self.packetHandler, self.dxl_id,
+                                                    address, length, value, self.acknowledged)
+        self._record(address, length, value, dxl_comm_result, dxl_error)
+        return dxl_comm_result, dxl_error
+
+    def write_eeprom(self, address, length, value):
+        """Writes an EEPROM register only if its value differs.
+
+        A cache miss costs a read instead of a write, which saves flash wear.
+        Protocol 2.0 servos lock EEPROM while torque is on, so torque is
+        switched off around an actual write and then restored.
+        """
+        if self.value(address, length) == value:
+            self.skipped += 1
+            return COMM_SUCCESS, 0
+
+        torque_address = self.spec["ADDR_TORQUE_ENABLE"]
+        torque = self.value(torque_address, 1) if self.spec["protocol"] == 2.0 else 0
+        if torque:
+            self.write(torque_address, 1, 0)
+        dxl_comm_result, dxl_error = self.write(address, length, value)
+        if torque:
+            self.write(torque_address, 1, torque)
+        return dxl_comm_result, dxl_error
+
+    def reboot(self):
+        """Reboots the servo (Protocol 2.0) and forgets everything mirrored"""
+        dxl_comm_result, dxl_error = self.packetHandler.reboot(self.portHandler, self.dxl_id)
+        self.invalidate()
+        return dxl_comm_result, dxl_error
@@ -0,0 +1,689 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Software-in-the-loop Dynamixel bus.
+
+SimPortHandler is a drop-in PortHandler: the SDK's packet handlers write real
+Protocol 1.0 / 2.0 instruction packets into it and parse the status packets
+that the emulated servos send back. Byte timing follows the baud rate, the
+servos honour Return Delay Time and Status Return Level, and comm errors can
+be injected. Run any script against it with:
+
+    python dxl_sim.py Data_TRIALS.py
+"""
+
+import random
+import runpy
+import sys
+import time
+import dynamixel_sdk
+from dynamixel_sdk import *
+
+# ---------------- Control tables ----------------
+# name: (address, size, default). Only the registers the scripts use, plus the
+# ones the tooling needs (IDs, baud, return delay, status level, health).
+P1_TABLE = {
+    "model_number":         (0, 2, 12),
+    "firmware":             (2, 1, 24),
+    "id":                   (3, 1, 1),
+    "baud_rate":            (4, 1, 1),
+    "return_delay":         (5, 1, 250),
+    "cw_angle_limit":       (6, 2, 0),
+    "ccw_angle_limit":      (8, 2, 1023),
+    "temperature_limit":    (11, 1, 70),
+    "min_voltage":          (12, 1, 60),
+    "max_voltage":          (13, 1, 140),
+    "max_torque":           (14, 2, 1023),
+    "status_return_level":  (16, 1, 2),
+    "alarm_led":            (17, 1, 36),
+    "shutdown":             (18, 1, 36),
+    "torque_enable":        (24, 1, 0),
+    "led":                  (25, 1, 0),
+    "goal_position":        (30, 2, 512),
+    "moving_speed":         (32, 2, 0),
+    "torque_limit":         (34, 2, 1023),
+    "present_position":     (36, 2, 512),
+    "present_speed":        (38, 2, 0),
+    "present_load":         (40, 2, 0),
+    "present_voltage":      (42, 1, 120),
+    "present_temperature":  (43, 1, 32),
+    "registered":           (44, 1, 0),
+    "moving":               (46, 1, 0),
+    "lock":                 (47, 1, 0),
+    "punch":                (48, 2, 32),
+}
+
+XC330_TABLE = {
+    "model_number":         (0, 2, 1210),
+    "firmware":             (6, 1, 52),
+    "id":                   (7, 1, 1),
+    "baud_rate":            (8, 1, 1),
+    "return_delay":         (9, 1, 250),
+    "drive_mode":           (10, 1, 0),
+    "operating_mode":       (11, 1, 3),
+    "protocol_type":        (13, 1, 2),
+    "moving_threshold":     (24, 4, 10),
+    "temperature_limit":    (31, 1, 70),
+    "max_voltage":          (32, 2, 140),
+    "min_voltage":          (34, 2, 35),
+    "current_limit":        (38, 2, 1750),
+    "velocity_limit":       (44, 4, 1023),
+    "max_position_limit":   (48, 4, 4095),
+    "min_position_limit":   (52, 4, 0),
+    "torque_enable":        (64, 1, 0),
+    "led":                  (65, 1, 0),
+    "status_return_level":  (68, 1, 2),
+    "registered":           (69, 1, 0),
+    "hardware_error":       (70, 1, 0),
+    "goal_current":         (102, 2, 0),
+    "goal_velocity":        (104, 4, 0),
+    "profile_velocity":     (112, 4, 0),
+    "goal_position":        (116, 4, 0),
+    "realtime_tick":        (120, 2, 0),
+    "moving":               (122, 1, 0),
+    "moving_status":        (123, 1, 0),
+    "present_current":      (126, 2, 0),
+    "present_velocity":     (128, 4, 0),
+    "present_position":     (132, 4, 0),
+    "present_voltage":      (144, 2, 120),
+    "present_temperature":  (146, 1, 35),
+}
+
+MODEL_SPECS = {
+    "AX-12A": {"protocol": 1.0, "model_number": 12, "table": P1_TABLE, "size": 50,
+               "eeprom_end": 24, "bulk_read": False, "fast_read": False},
+    "RX-10":  {"protocol": 1.0, "model_number": 10, "table": P1_TABLE, "size": 50,
+               "eeprom_end": 24, "bulk_read": False, "fast_read": False},
+    "MX-28":  {"protocol": 1.0, "model_number": 29, "table": P1_TABLE, "size": 50,
+               "eeprom_end": 24, "bulk_read": True, "fast_read": False},
+    "XC330":  {"protocol": 2.0, "model_number": 1210, "table": XC330_TABLE, "size": 147,
+               "eeprom_end": 64, "bulk_read": True, "fast_read": True},
+}
+
+# Writable address ranges (inclusive start, exclusive end)
+P1_WRITABLE = [(3, 24), (24, 36), (44, 45), (47, 50)]
+XC330_WRITABLE = [(7, 64), (64, 120)]
+
+# Value ranges the firmware enforces on writes
+P1_LIMITS = {"cw_angle_limit": (0, 1023), "ccw_angle_limit": (0, 1023), "goal_position": (0, 1023),
+             "moving_speed": (0, 2047), "torque_limit": (0, 1023), "max_torque": (0, 1023),
+             "return_delay": (0, 254), "status_return_level": (0, 2)}
+XC330_LIMITS = {"operating_mode": (0, 16), "return_delay": (0, 254), "status_return_level": (0, 2),
+                "baud_rate": (0, 6)}
+
+P2_BAUD_TABLE = {0: 9600, 1: 57600, 2: 115200, 3: 1000000, 4: 2000000, 5: 3000000, 6: 4000000}
+
+# Protocol 1.0 error bits / Protocol 2.0 error numbers
+P1_ERR_ANGLE, P1_ERR_RANGE, P1_ERR_INSTRUCTION = 2, 8, 64
+P2_ERR_INSTRUCTION, P2_ERR_CRC, P2_ERR_DATA_RANGE, P2_ERR_DATA_LIMIT, P2_ERR_ACCESS = 2, 3, 4, 6, 7
+P2_ERR_ALERT = 0x80
+
+P1_TICKS_PER_S = 0.111 / 60 * 1024 * 360 / 300    # per speed unit, 1024 ticks over 300°
+P1_FULL_TURN = 1024 * 360 / 300                    # ticks per revolution, incl. the 60° dead zone
+P2_TICKS_PER_S = 0.229 / 60 * 4096                 # per velocity unit
+
+_crc = PacketHandler(2.0).updateCRC
+
+
+# MX firmware reserves these register values for rates above 2 Mbit/s
+P1_HIGH_BAUD = {250: 2250000, 251: 2500000, 252: 3000000}
+
+
+def p1_baudrate(value):
+    return P1_HIGH_BAUD.get(value, 2000000 / (value + 1))
+
+
+def p1_baud_value(baudrate):
+    for value, rate in P1_HIGH_BAUD.items():
+        if rate == baudrate:
+            return value
+    return max(0, min(254, round(2000000 / baudrate) - 1))
+
+
+# ---------------- Servo model ----------------
+class SimServo:
+    """One emulated servo: a control table plus simple motion physics"""
+
+    def __init__(self, dxl_id, model, baudrate=None, return_delay=None, clock=time.perf_counter):
+        self.spec = MODEL_SPECS[model]
+        self.model = model
+        self.protocol = self.spec["protocol"]
+        self.table_spec = self.spec["table"]
+        self.clock = clock
+        self.hardware_error = 0     # P1 error bits / P2 Hardware Error Status bits to report
+        self.fast_read = self.spec["fast_read"]
+
+        self.table = bytearray(self.spec["size"])
+        self.factory_reset()
+        self.set("id", dxl_id)
+        if baudrate is not None:
+            self.baudrate = baudrate
+        if return_delay is not None:
+            self.set("return_delay", return_delay)
+
+    # ---- register access ----
+    def get(self, name):
+        address, size, _ = self.table_spec[name]
+        return int.from_bytes(self.table[address:address + size], "little")
+
+    def get_signed(self, name):
+        _, size, _ = self.table_spec[name]
+        value = self.get(name)
+        if value & (1 << (size * 8 - 1)):
+            value -= 1 << (size * 8)
+        return value
+
+    def set(self, name, value):
+        address, size, _ = self.table_spec[name]
+        self.table[address:address + size] = (int(value) & ((1 << (size * 8)) - 1)).to_bytes(size, "little")
+
+    @property
+    def dxl_id(self):
+        return self.get("id")
+
+    @property
+    def baudrate(self):
+        value = self.get("baud_rate")
+        if self.protocol == 1.0:
+            return p1_baudrate(value)
+        return P2_BAUD_TABLE.get(value, 57600)
+
+    @baudrate.setter
+    def baudrate(self, baudrate):
+        if self.protocol == 1.0:
+            self.set("baud_rate", p1_baud_value(baudrate))
+        else:
+            self.set("baud_rate", {v: k for k, v in P2_BAUD_TABLE.items()}[baudrate])
+
+    @property
+    def return_delay_s(self):
+        return self.get("return_delay") * 2e-6
+
+    def factory_reset(self):
+        dxl_id = self.table[self.table_spec["id"][0]] if any(self.table) else 1
+        self.table[:] = bytes(len(self.table))
+        for name, (_, _, default) in self.table_spec.items():
+            self.set(name, default)
+        self.set("model_number", self.spec["model_number"])
+        self.set("id", dxl_id)
+        self.reboot()
+
+    def reboot(self):
+        """Clears the RAM area, as a power cycle would"""
+        eeprom_end = self.spec["eeprom_end"]
+        for name, (address, _, default) in self.table_spec.items():
+            if address >= eeprom_end:
+                self.set(name, default)
+        self.position = float(self.get("present_position"))
+        self.velocity = 0.0
+        self.pending = None
+        self.last_update = self.clock()
+        self.hardware_error = 0
+
+    # ---- physics ----
+    def update(self):
+        now = self.clock()
+        dt = now - self.last_update
+        self.last_update = now
+        if self.protocol == 1.0:
+            self._update_p1(dt)
+        else:
+            self._update_p2(dt)
+
+    def _move_toward(self, goal, max_speed, ticks_per_unit, dt):
+        step = max_speed * ticks_per_unit * dt
+        delta = goal - self.position
+        if abs(delta) <= step:
+            self.position = float(goal)
+            return 0.0
+        self.position += step if delta > 0 else -step
+        return max_speed if delta > 0 else -max_speed
+
+    def _update_p1(self, dt):
+        speed_reg = self.get("moving_speed")
+        magnitude = speed_reg & 0x3FF
+        if not self.get("torque_enable"):
+            self.velocity = 0.0
+        elif self.get("cw_angle_limit") == 0 and self.get("ccw_angle_limit") == 0:
+            # Wheel mode: bit 10 selects CW; the pot reads 0-1023 over 300°
+            # and stays at 1023 through the 60° dead zone
+            self.velocity = -magnitude if speed_reg & 0x400 else magnitude
+            self.position = (self.position + self.velocity * P1_TICKS_PER_S * dt) % P1_FULL_TURN
+        else:
+            goal = min(max(self.get("goal_position"), self.get("cw_angle_limit")), self.get("ccw_angle_limit"))
+            self.velocity = self._move_toward(goal, magnitude or 1023, P1_TICKS_PER_S, dt)
+
+        speed = int(abs(self.velocity))
+        direction = 0x400 if self.velocity < 0 else 0
+        self.set("present_position", min(int(self.position), 1023))
+        self.set("present_speed", speed | direction)
+        self.set("present_load", (min(1023, 40 + speed // 4) | direction) if speed else 0)
+        self.set("moving", 1 if speed else 0)
+
+    def _update_p2(self, dt):
+        mode = self.get("operating_mode")
+        velocity_limit = self.get("velocity_limit")
+        if not self.get("torque_enable") or mode == 0:
+            self.velocity = 0.0
+        elif mode == 1:
+            goal = self.get_signed("goal_velocity")
+            self.velocity = float(max(-velocity_limit, min(velocity_limit, goal)))
+            self.position += self.velocity * P2_TICKS_PER_S * dt
+        else:
+            goal = self.get_signed("goal_position")
+            if mode == 3:
+                goal = min(max(goal, self.get("min_position_limit")), self.get("max_position_limit"))
+            self.velocity = self._move_toward(goal, self.get("profile_velocity") or velocity_limit,
+                                              P2_TICKS_PER_S, dt)
+
+        velocity = int(self.velocity)
+        self.set("present_velocity", velocity)
+        self.set("present_position", int(round(self.position)))
+        current = 40 + abs(velocity) // 2 if velocity else 0
+        self.set("present_current", current if velocity >= 0 else -current)
+        self.set("moving", 1 if velocity else 0)
+        arrived = mode in (3, 4) and abs(self.get_signed("goal_position") - self.position) <= self.get("moving_threshold")
+        self.set("moving_status", 1 if arrived else 0)
+        self.set("realtime_tick", int(self.clock() * 1000) % 32768)
+        self.set("hardware_error", self.hardware_error)
+
+    # ---- instruction handling ----
+    def read(self, address, length):
+        """Returns (data, error) for a READ of address..address+length"""
+        self.update()
+        if address + length > len(self.table):
+            return b"", self._range_error()
+        return bytes(self.table[address:address + length]), 0
+
+    def write(self, address, data):
+        """Applies a WRITE and returns the status error code"""
+        self.update()
+        end = address + len(data)
+        writable = P1_WRITABLE if self.protocol == 1.0 else XC330_WRITABLE
+        if not any(start <= address and end <= stop for start, stop in writable):
+            return self._range_error() if self.protocol == 1.0 else P2_ERR_ACCESS
+        if self.protocol == 2.0 and address < self.spec["eeprom_end"] and self.get("torque_enable"):
+            # EEPROM is locked while torque is on
+            return P2_ERR_ACCESS
+
+        previous = bytes(self.table)
+        self.table[address:end] = data
+        limits = P1_LIMITS if self.protocol == 1.0 else XC330_LIMITS
+        for name, (low, high) in limits.items():
+            reg_address, size, _ = self.table_spec[name]
+            if address < reg_address + size and reg_address < end and not low <= self.get(name) <= high:
+                self.table[:] = previous
+                return self._range_error() if self.protocol == 1.0 else P2_ERR_DATA_RANGE
+
+        if self.protocol == 2.0:
+            if abs(self.get_signed("goal_velocity")) > self.get("velocity_limit"):
+                self.table[:] = previous
+                return P2_ERR_DATA_LIMIT
+            if address <= self.table_spec["operating_mode"][0] < end:
+                # Mode changes restart the single-turn position range
+                self.position %= 4096
+        elif address <= self.table_spec["goal_position"][0] < end:
+            goal = self.get("goal_position")
+            if self.get("ccw_angle_limit") and not self.get("cw_angle_limit") <= goal <= self.get("ccw_angle_limit"):
+                return P1_ERR_ANGLE
+        return 0
+
+    def _range_error(self):
+        return P1_ERR_RANGE if self.protocol == 1.0 else P2_ERR_DATA_RANGE
+
+    def status_error(self, error):
+        if self.protocol == 1.0:
+            return error | self.hardware_error
+        return error | (P2_ERR_ALERT if self.hardware_error else 0)
+
+    def responds_to(self, is_read):
+        """Status Return Level: 0 = ping only, 1 = ping and reads, 2 = everything"""
+        level = self.get("status_return_level")
+        return level == 2 or (level == 1 and is_read)
+
+
+# ---------------- Packet framing ----------------
+def p1_packet(dxl_id, error, params):
+    body = [dxl_id, len(params) + 2, error] + list(params)
+    return bytes([0xFF, 0xFF] + body + [~sum(body) & 0xFF])
+
+
+def p2_stuff(data):
+    out = bytearray()
+    for byte in data:
+        out.append(byte)
+        if byte == 0xFD and out[-3:-1] == b"\xff\xff" and len(out) >= 3:
+            out.append(0xFD)
+    return bytes(out)
+
+
+def p2_unstuff(data):
+    return bytes(data).replace(b"\xff\xff\xfd\xfd", b"\xff\xff\xfd")
+
+
+def p2_packet(dxl_id, error, params, stuff=True):
+    body = bytes([0x55, error]) + bytes(params)
+    if stuff:
+        body = p2_stuff(body)
+    length = len(body) + 2
+    packet = [0xFF, 0xFF, 0xFD, 0x00, dxl_id, length & 0xFF, length >> 8] + list(body)
+    crc = _crc(0, packet, len(packet))
+    return bytes(packet + [crc & 0xFF, crc >> 8])
+
+
+def p2_fast_packet(blocks):
+    """Fast Sync/Bulk Read reply: one packet from ID 0xFE with ERR ID DATA CRC per servo"""
+    params = bytearray()
+    for dxl_id, error, data in blocks:
+        block = bytes([error, dxl_id]) + data
+        crc = _crc(0, list(block), len(block))
+        params += block + bytes([crc & 0xFF, crc >> 8])
+    length = len(params) + 3
+    packet = [0xFF, 0xFF, 0xFD, 0x00, BROADCAST_ID, length & 0xFF, length >> 8, 0x55] + list(params)
+    crc = _crc(0, packet, len(packet))
+    return bytes(packet + [crc & 0xFF, crc >> 8])
+
+
+# ---------------- Virtual port ----------------
+class SimPortHandler(PortHandler):
+    """PortHandler backed by emulated servos instead of a serial device.
+
+    realtime  : status bytes only become readable after their wire time at
+                the current baud rate (plus return delay and `latency`)
+    latency   : extra host-side delay per status packet, e.g. a USB latency timer
+    drop_rate / corrupt_rate : probability a status packet is lost / garbled
+    """
+
+    def __init__(self, port_name="sim", servos=(), realtime=True, latency=0.0,
+                 drop_rate=0.0, corrupt_rate=0.0, seed=None):
+        super().__init__(port_name)
+        self.servos = list(servos)
+        self.realtime = realtime
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self.rng = random.Random(seed)
+        self.rx = bytearray()
+        self.pending = []       # (ready time, status bytes)
+        self.instructions = 0
+        self.dropped = 0
+        self.corrupted = 0
+
+    def add_servo(self, servo):
+        self.servos.append(servo)
+        return servo
+
+    # ---- PortHandler interface ----
+    def setupPort(self, cflag_baud):
+        self.is_open = True
+        self.rx.clear()
+        self.pending.clear()
+        self.tx_time_per_byte = (1000.0 / self.baudrate) * 10.0
+        return True
+
+    def closePort(self):
+        self.is_open = False
+
+    def clearPort(self):
+        self.rx.clear()
+        self.pending.clear()
+
+    def getBytesAvailable(self):
+        self._collect()
+        return len(self.rx)
+
+    def readPort(self, length):
+        self._collect()
+        data = bytes(self.rx[:length])
+        del self.rx[:length]
+        return data
+
+    def writePort(self, packet):
+        packet = bytes(packet)
+        self.instructions += 1
+        now = time.perf_counter()
+        byte_time = 10.0 / self.baudrate if self.realtime else 0.0
+        t = now + len(packet) * byte_time
+        for servo, status, apply_after in self._dispatch(packet):
+            if status is not None:
+                if self.realtime:
+                    t += servo.return_delay_s if servo is not None else 0.0
+                    t += len(status) * byte_time
+                self._queue(t, status)
+            if apply_after is not None:
+                apply_after()
+        return len(packet)
+
+    # ---- internals ----
+    def _collect(self):
+        if not self.pending:
+            return
+        now = time.perf_counter()
+        while self.pending and self.pending[0][0] <= now:
+            self.rx += self.pending.pop(0)[1]
+
+    def _queue(self, t, status):
+        if self.rng.random() < self.drop_rate:
+            self.dropped += 1
+            return
+        if self.rng.random() < self.corrupt_rate:
+            self.corrupted += 1
+            status = bytearray(status)
+            status[self.rng.randrange(2, len(status))] ^= 0xFF
+            status = bytes(status)
+        ready = t + self.latency if self.realtime else t
+        self.pending.append((ready, status))
+
+    def _listening(self, protocol):
+        # A servo only decodes packets sent at (close to) its own baud rate
+        return [s for s in self.servos if s.protocol == protocol
+                and abs(s.baudrate - self.baudrate) / self.baudrate < 0.03]
+
+    def _dispatch(self, packet):
+        """Yields (servo, status packet or None, callback run after queueing)"""
+        if packet[:4] == b"\xff\xff\xfd\x00":
+            return self._dispatch_p2(packet)
+        if packet[:2] == b"\xff\xff":
+            return self._dispatch_p1(packet)
+        return []
+
+    def _dispatch_p1(self, packet):
+        if len(packet) < 6 or len(packet) != packet[3] + 4:
+            return []
+        if (~sum(packet[2:-1]) & 0xFF) != packet[-1]:
+            return []
+        dxl_id, inst, params = packet[2], packet[4], packet[5:-1]
+        servos = self._listening(1.0)
+        by_id = {s.dxl_id: s for s in servos}
+        replies = []
+
+        if inst == INST_SYNC_WRITE:
+            address, length = params[0], params[1]
+            for i in range(2, len(params), length + 1):
+                servo = by_id.get(params[i])
+                if servo:
+                    servo.write(address, params[i + 1:i + 1 + length])
+            return replies
+
+        if inst == INST_BULK_READ:
+            for i in range(1, len(params), 3):
+                length, target, address = params[i], params[i + 1], params[i + 2]
+                servo = by_id.get(target)
+                if servo is None or not servo.spec["bulk_read"]:
+                    break   # the chain stalls at the first servo that cannot answer
+                data, error = servo.read(address, length)
+                replies.append((servo, p1_packet(target, servo.status_error(error), data), None))
+            return replies
+
+        targets = servos if dxl_id == BROADCAST_ID else [by_id[dxl_id]] if dxl_id in by_id else []
+        for servo in targets:
+            params_out, error, is_read, after = b"", 0, False, None
+            if inst == INST_PING:
+                is_read = True
+            elif inst == INST_READ:
+                params_out, error = servo.read(params[0], params[1])
+                is_read = True
+            elif inst == INST_WRITE:
+                baud_before = servo.get("baud_rate")
+                error = servo.write(params[0], params[1:])
+                if servo.get("baud_rate") != baud_before:
+                    # New baud rate takes effect once the status packet has gone out
+                    new_value = servo.get("baud_rate")
+                    servo.set("baud_rate", baud_before)
+                    after = (lambda s=servo, v=new_value: s.set("baud_rate", v))
+            elif inst == INST_REG_WRITE:
+                servo.pending = (params[0], bytes(params[1:]))
+                servo.set("registered", 1)
+            elif inst == INST_ACTION:
+                if servo.pending:
+                    servo.write(*servo.pending)
+                    servo.pending = None
+                    servo.set("registered", 0)
+            elif inst == INST_FACTORY_RESET:
+                after = servo.factory_reset
+            elif inst == INST_REBOOT and servo.model != "AX-12A":
+                after = servo.reboot
+            else:
+                error = P1_ERR_INSTRUCTION
+
+            status = None
+            if dxl_id != BROADCAST_ID and (inst == INST_PING or servo.responds_to(is_read)):
+                status = p1_packet(servo.dxl_id, servo.status_error(error), params_out)
+            replies.append((servo, status, after))
+        return replies
+
+    def _dispatch_p2(self, packet):
+        if len(packet) < 10:
+            return []
+        length = packet[5] | (packet[6] << 8)
+        if len(packet) != length + 7:
+            return []
+        dxl_id, inst = packet[4], packet[7]
+        servos = self._listening(2.0)
+        by_id = {s.dxl_id: s for s in servos}
+        crc_ok = _crc(0, list(packet), len(packet) - 2) == (packet[-2] | (packet[-1] << 8))
+        params = p2_unstuff(packet[8:-2])
+        word = lambda i: params[i] | (params[i + 1] << 8)
+        replies = []
+
+        if not crc_ok:
+            servo = by_id.get(dxl_id)
+            if servo is not None and servo.responds_to(False):
+                replies.append((servo, p2_packet(dxl_id, servo.status_error(P2_ERR_CRC), b""), None))
+            return replies
+
+        if inst in (INST_SYNC_READ, INST_FAST_SYNC_READ):
+            address, count = word(0), word(2)
+            requests = [(target, address, count) for target in params[4:]]
+            return self._group_read(by_id, requests, inst == INST_FAST_SYNC_READ)
+
+        if inst in (INST_BULK_READ, INST_FAST_BULK_READ):
+            requests = [(params[i], word(i + 1), word(i + 3)) for i in range(0, len(params), 5)]
+            return self._group_read(by_id, requests, inst == INST_FAST_BULK_READ)
+
+        if inst == INST_SYNC_WRITE:
+            address, count = word(0), word(2)
+            for i in range(4, len(params), count + 1):
+                servo = by_id.get(params[i])
+                if servo:
+                    servo.write(address, params[i + 1:i + 1 + count])
+            return replies
+
+        if inst == INST_BULK_WRITE:
+            i = 0
+            while i < len(params):
+                address, count = word(i + 1), word(i + 3)
+                servo = by_id.get(params[i])
+                if servo:
+                    servo.write(address, params[i + 5:i + 5 + count])
+                i += 5 + count
+            return replies
+
+        targets = servos if dxl_id == BROADCAST_ID else [by_id[dxl_id]] if dxl_id in by_id else []
+        targets = sorted(targets, key=lambda s: s.dxl_id)
+        for servo in targets:
+            params_out, error, is_read, after = b"", 0, False, None
+            if inst == INST_PING:
+                model = servo.get("model_number")
+                params_out = bytes([model & 0xFF, model >> 8, servo.get("firmware")])
+            elif inst == INST_READ:
+                params_out, error = servo.read(word(0), word(2))
+                is_read = True
+            elif inst == INST_WRITE:
+                baud_before = servo.get("baud_rate")
+                error = servo.write(word(0), params[2:])
+                if servo.get("baud_rate") != baud_before:
+                    new_value = servo.get("baud_rate")
+                    servo.set("baud_rate", baud_before)
+                    after = (lambda s=servo, v=new_value: s.set("baud_rate", v))
+            elif inst == INST_REG_WRITE:
+                servo.pending = (word(0), bytes(params[2:]))
+                servo.set("registered", 1)
+            elif inst == INST_ACTION:
+                if servo.pending:
+                    servo.write(*servo.pending)
+                    servo.pending = None
+                    servo.set("registered", 0)
+            elif inst == INST_REBOOT:
+                after = servo.reboot
+            elif inst == INST_FACTORY_RESET:
+                after = servo.factory_reset
+            elif inst == INST_CLEAR:
+                servo.update()
+                servo.position %= 4096
+            else:
+                error = P2_ERR_INSTRUCTION
+
+            # Broadcast ping is answered by everyone; other broadcasts are silent
+            answers = inst == INST_PING or (dxl_id != BROADCAST_ID and servo.responds_to(is_read))
+            status = p2_packet(servo.dxl_id, servo.status_error(error), params_out) if answers else None
+            replies.append((servo, status, after))
+        return replies
+
+    def _group_read(self, by_id, requests, fast):
+        replies = []
+        blocks = []
+        for target, address, count in requests:
+            servo = by_id.get(target)
+            if servo is None or not servo.responds_to(True) or (fast and not servo.fast_read):
+                if fast:
+                    return []   # a missing member leaves the combined reply incomplete
+                continue
+            data, error = servo.read(address, count)
+            if fast:
+                blocks.append((target, servo.status_error(error), data))
+            else:
+                replies.append((servo, p2_packet(target, servo.status_error(error), data), None))
+        if fast and blocks:
+            first = by_id[requests[0][0]]
+            replies.append((first, p2_fast_packet(blocks), None))
+        return replies
+
+
+# ---------------- Script runner ----------------
+def default_bench():
+    """The servos the scripts in this repo expect, at their factory settings"""
+    return [
+        SimServo(101, "AX-12A", baudrate=1000000),
+        SimServo(1, "AX-12A", baudrate=1000000),
+        SimServo(3, "XC330", baudrate=57600),
+    ]
+
+
+def install(servos=None, **options):
+    """Makes dynamixel_sdk.PortHandler build SimPortHandlers on one shared bench.
+
+    Must run before the script does `from dynamixel_sdk import *`.
+    """
+    bench = default_bench() if servos is None else servos
+    dynamixel_sdk.PortHandler = lambda port_name: SimPortHandler(port_name, bench, **options)
+    return bench
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python dxl_sim.py <script.py> [args...]")
+        quit()
+    install()
+    sys.argv = sys.argv[1:]
+    runpy.run_path(sys.argv[0], run_name="__main__")
@@ -0,0 +1,90 @@
+from dynamixel_sdk import *
+from dxl_telemetry import MODELS
+import time
+
+
+class SyncTelemetry:
+    """Samples several Protocol 2.0 servos of one model with one Sync Read per tick.
+
+    Fast Sync Read (one combined status packet) is used when the SDK and the
+    servo firmware support it; the first failed fast read that a plain Sync
+    Read answers switches the engine to plain Sync Read for good.
+    """
+
+    def __init__(self, portHandler, packetHandler, dxl_ids, model="XC330", use_fast=True):
+        self.spec = MODELS[model]
+        if self.spec["protocol"] != 2.0:
+            raise ValueError(f"Sync Read needs a Protocol 2.0 model, got {model}")
+
+        self.dxl_ids = list(dxl_ids)
+        self.group = GroupSyncRead(portHandler, packetHandler,
+                                   self.spec["block_start"], self.spec["block_length"])
+        for dxl_id in self.dxl_ids:
+            if not self.group.addParam(dxl_id):
+                raise ValueError(f"Duplicate or invalid ID {dxl_id}")
+
+        # Older SDK releases have no fastSyncRead at all
+        self.use_fast = use_fast and hasattr(self.group, "fastSyncRead")
+
+    def read(self):
+        """Reads every servo in one transaction.
+
+        Returns (list of Telemetry or None in dxl_ids order, dxl_comm_result).
+        """
+        if self.use_fast:
+            dxl_comm_result = self.group.fastSyncRead()
+            if dxl_comm_result != COMM_SUCCESS:
+                dxl_comm_result = self.group.txRxPacket()
+                if dxl_comm_result == COMM_SUCCESS:
+                    self.use_fast = False
+        else:
+            dxl_comm_result = self.group.txRxPacket()
+
+        if dxl_comm_result != COMM_SUCCESS:
+            return [None] * len(self.dxl_ids), dxl_comm_result
+
+        decode = self.spec["decode"]
+        start = self.spec["block_start"]
+        length = self.spec["block_length"]
+        samples = []
+        for dxl_id in self.dxl_ids:
+            if self.group.isAvailable(dxl_id, start, length):
+                samples.append(decode(self.group.data_dict[dxl_id]))
+            else:
+                samples.append(None)
+        return samples, dxl_comm_result
+
+
+if __name__ == "__main__":
+    # ---------------- Settings ----------------
+    PROTOCOL_VERSION        = 2.0
+    DXL_MODEL               = "XC330"
+    DXL_IDS                 = [1, 2, 3]
+    BAUDRATE                = 57600
+    DEVICENAME              = 'com6'
+    SAMPLES                 = 200
+
+    portHandler = PortHandler(DEVICENAME)
+    packetHandler = PacketHandler(PROTOCOL_VERSION)
+
+    if not portHandler.openPort():
+        print("Failed to open port")
+        quit()
+    if not portHandler.setBaudRate(BAUDRATE):
+        print("Failed to set baudrate")
+        quit()
+
+    telemetry = SyncTelemetry(portHandler, packetHandler, DXL_IDS, DXL_MODEL)
+    failures = 0
+    start_time = time.perf_counter()
+    for _ in range(SAMPLES):
+        samples, dxl_comm_result = telemetry.read()
+        if dxl_comm_result != COMM_SUCCESS:
+            failures += 1
+    elapsed = time.perf_counter() - start_time
+
+    for dxl_id, sample in zip(DXL_IDS, samples):
+        print(f"[ID:{dxl_id}] {sample}")
+    print(f"{SAMPLES / elapsed:.1f} ticks/s, {failures} failed, "
+          f"{'Fast Sync Read' if telemetry.use_fast else 'Sync Read'}")
+    portHandler.closePort()
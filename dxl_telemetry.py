@@ -0,0 +1,159 @@
+from dynamixel_sdk import *
+from collections import namedtuple
+
+# ---------------- Decoded sample ----------------
+# position : raw present position ticks
+# velocity : signed present speed/velocity in the model's native units
+# effort   : signed present load (Protocol 1.0, 0.1 % of max torque) or
+#            signed present current (Protocol 2.0, mA)
+Telemetry = namedtuple("Telemetry", ["position", "velocity", "effort"])
+
+
+# ---------------- Decoders ----------------
+def to_signed(value, bits):
+    """Converts an unsigned register value to two's complement"""
+    if value & (1 << (bits - 1)):
+        value -= 1 << bits
+    return value
+
+
+def decode_p1_directional(raw):
+    """Converts a Protocol 1.0 speed/load word (bit 10 = CW direction) to a signed value"""
+    magnitude = raw & 0x3FF
+    if raw & 0x400:
+        return -magnitude
+    return magnitude
+
+
+def decode_p1_block(data):
+    """Decodes PRESENT_POSITION(36)..PRESENT_LOAD(40) read as one 6-byte block"""
+    position = data[0] | (data[1] << 8)
+    speed = decode_p1_directional(data[2] | (data[3] << 8))
+    load = decode_p1_directional(data[4] | (data[5] << 8))
+    return Telemetry(position, speed, load)
+
+
+def decode_p2_block(data):
+    """Decodes PRESENT_CURRENT(126)..PRESENT_POSITION(132) read as one 10-byte block"""
+    current = to_signed(data[0] | (data[1] << 8), 16)
+    velocity = to_signed(data[2] | (data[3] << 8) | (data[4] << 16) | (data[5] << 24), 32)
+    position = to_signed(data[6] | (data[7] << 8) | (data[8] << 16) | (data[9] << 24), 32)
+    return Telemetry(position, velocity, current)
+
+
+# ---------------- Model table ----------------
+# block_start/block_length cover the contiguous present-state registers so a
+# whole sample is fetched with a single readTxRx. bulk_read marks Protocol 1.0
+# models whose firmware answers the Bulk Read instruction (0x92). The ADDR_*
+# entries are the 1-byte configuration registers the tooling touches; baud_table
+# maps Baud Rate register values to bit/s. A single-turn present position
+# spans position_range ticks over position_degrees (AX/RX leave a 60° dead zone).
+# health lists the slow-changing status registers as name -> (address, length);
+# Protocol 1.0 has no hardware error register, its error bits come back in
+# every status packet instead.
+
+# Baud Rate register value -> bit/s, limited to the rates the SDK port can be
+# set to (2 Mbit/s / (value + 1) on Protocol 1.0, fixed table on Protocol 2.0)
+P1_BAUD_TABLE = {1: 1000000, 3: 500000, 16: 115200, 34: 57600, 103: 19200, 207: 9600}
+MX_BAUD_TABLE = {**P1_BAUD_TABLE, 0: 2000000, 251: 2500000, 252: 3000000}
+XC330_BAUD_TABLE = {0: 9600, 1: 57600, 2: 115200, 3: 1000000, 4: 2000000, 5: 3000000, 6: 4000000}
+
+MODELS = {
+    "AX-12A": {
+        "protocol": 1.0,
+        "model_numbers": (12,),
+        "block_start": 36,      # PRESENT_POSITION, PRESENT_SPEED, PRESENT_LOAD
+        "block_length": 6,
+        "decode": decode_p1_block,
+        "rpm_per_unit": 0.111,
+        "position_range": 1024,
+        "position_degrees": 300.0,
+        "bulk_read": False,
+        "ADDR_RETURN_DELAY": 5,
+        "ADDR_STATUS_RETURN_LEVEL": 16,
+        "ADDR_TORQUE_ENABLE": 24,
+        "ADDR_LED": 25,
+        "ADDR_MOVING": 46,
+        "ADDR_BAUD_RATE": 4,
+        "health": {"voltage": (42, 1), "temperature": (43, 1)},     # 0.1 V, °C
+        "baud_table": P1_BAUD_TABLE,
+    },
+    "RX-10": {
+        "protocol": 1.0,
+        "model_numbers": (10,),
+        "block_start": 36,
+        "block_length": 6,
+        "decode": decode_p1_block,
+        "rpm_per_unit": 0.111,
+        "position_range": 1024,
+        "position_degrees": 300.0,
+        "bulk_read": False,
+        "ADDR_RETURN_DELAY": 5,
+        "ADDR_STATUS_RETURN_LEVEL": 16,
+        "ADDR_TORQUE_ENABLE": 24,
+        "ADDR_LED": 25,
+        "ADDR_MOVING": 46,
+        "ADDR_BAUD_RATE": 4,
+        "health": {"voltage": (42, 1), "temperature": (43, 1)},     # 0.1 V, °C
+        "baud_table": P1_BAUD_TABLE,
+    },
+    "MX-28": {
+        "protocol": 1.0,
+        "model_numbers": (29,),
+        "block_start": 36,
+        "block_length": 6,
+        "decode": decode_p1_block,
+        "rpm_per_unit": 0.114,
+        "position_range": 4096,
+        "position_degrees": 360.0,
+        "bulk_read": True,
+        "ADDR_RETURN_DELAY": 5,
+        "ADDR_STATUS_RETURN_LEVEL": 16,
+        "ADDR_TORQUE_ENABLE": 24,
+        "ADDR_LED": 25,
+        "ADDR_MOVING": 46,
+        "ADDR_BAUD_RATE": 4,
+        "health": {"voltage": (42, 1), "temperature": (43, 1)},     # 0.1 V, °C
+        "baud_table": MX_BAUD_TABLE,
+    },
+    "XC330": {
+        "protocol": 2.0,
+        "model_numbers": (1190, 1200, 1210, 1220, 1240),      # M077, M181, T181, T288, M288
+        "block_start": 126,     # PRESENT_CURRENT, PRESENT_VELOCITY, PRESENT_POSITION
+        "block_length": 10,
+        "decode": decode_p2_block,
+        "rpm_per_unit": 0.229,
+        "position_range": 4096,
+        "position_degrees": 360.0,
+        "ADDR_RETURN_DELAY": 9,
+        "ADDR_STATUS_RETURN_LEVEL": 68,
+        "ADDR_TORQUE_ENABLE": 64,
+        "ADDR_LED": 65,
+        "ADDR_MOVING": 122,     # followed by Moving Status (bit 0: in position)
+        "ADDR_BAUD_RATE": 8,
+        "health": {"hardware_error": (70, 1), "voltage": (144, 2), "temperature": (146, 1)},
+        "baud_table": XC330_BAUD_TABLE,
+    },
+}
+
+
+def model_for_number(model_number, protocol=None):
+    """The MODELS name for a model number from ping(), or None if it is not listed"""
+    for name, spec in MODELS.items():
+        if model_number in spec["model_numbers"] and protocol in (None, spec["protocol"]):
+            return name
+    return None
+
+
+def read_telemetry(portHandler, packetHandler, dxl_id, model):
+    """Reads position, velocity and load/current of one servo in a single transaction.
+
+    Returns (Telemetry or None, dxl_comm_result, dxl_error) like the SDK read calls.
+    """
+    spec = MODELS[model]
+    data, dxl_comm_result, dxl_error = packetHandler.readTxRx(
+        portHandler, dxl_id, spec["block_start"], spec["block_length"]
+    )
+    if dxl_comm_result != COMM_SUCCESS or len(data) < spec["block_length"]:
+        return None, dxl_comm_result, dxl_error
+    return spec["decode"](data), dxl_comm_result, dxl_error
@@ -0,0 +1,78 @@
+import time
+import matplotlib.pyplot as plt
+from acquisition import RECORD_FIELDS
+
+
+class LivePlot:
+    """Blitted rolling view of the newest samples in a RingBuffer.
+
+    Only the last `window` records are drawn against a fixed "seconds before
+    now" axis, so each frame costs the same no matter how long the run is.
+    Call refresh() from the consumer loop; it returns straight away when
+    called faster than max_fps and never touches the serial port.
+    """
+
+    def __init__(self, buffer, channels, window=500, span=10.0, max_fps=15, title=None):
+        """channels: list of (record field, axis label, scale) tuples"""
+        self.buffer = buffer
+        self.window = window
+        self.min_interval = 1.0 / max_fps
+        self.last_frame = 0.0
+        self.channels = [(RECORD_FIELDS.index(field), scale) for field, _, scale in channels]
+
+        self.fig, axes = plt.subplots(len(channels), 1, figsize=(10, 6), sharex=True, squeeze=False)
+        self.axes = axes[:, 0]
+        self.lines = []
+        for ax, (_, label, _) in zip(self.axes, channels):
+            ax.set_ylabel(label)
+            ax.set_xlim(-span, 0)
+            ax.set_ylim(-1, 1)
+            ax.grid(True)
+            line, = ax.plot([], [], animated=True)
+            self.lines.append(line)
+        self.axes[-1].set_xlabel("Time before now (s)")
+        if title:
+            self.fig.suptitle(title)
+
+        plt.show(block=False)
+        self._redraw_background()
+
+    def _redraw_background(self):
+        # Full draw of axes, ticks and labels; the animated lines are excluded
+        self.fig.canvas.draw()
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+
+    def refresh(self):
+        now = time.perf_counter()
+        if now - self.last_frame < self.min_interval:
+            return
+        self.last_frame = now
+
+        records, _, _ = self.buffer.read(max(0, self.buffer.written - self.window))
+        if len(records) == 0:
+            return
+        t = records[:, 0] - records[-1, 0]
+
+        rescaled = False
+        for ax, line, (column, scale) in zip(self.axes, self.lines, self.channels):
+            y = records[:, column] * scale
+            line.set_data(t, y)
+            low, high = ax.get_ylim()
+            y_min, y_max = y.min(), y.max()
+            if y_min < low or y_max > high:
+                # Grow only, so the expensive full redraw stays rare
+                margin = 0.1 * (y_max - y_min) or 1.0
+                ax.set_ylim(min(low, y_min - margin), max(high, y_max + margin))
+                rescaled = True
+
+        if rescaled:
+            self._redraw_background()
+        else:
+            self.fig.canvas.restore_region(self.background)
+        for ax, line in zip(self.axes, self.lines):
+            ax.draw_artist(line)
+        self.fig.canvas.blit(self.fig.bbox)
+        self.fig.canvas.flush_events()
+
+    def close(self):
+        plt.close(self.fig)
@@ -0,0 +1,78 @@
+import time
+from dynamixel_sdk import *
+from dxl_telemetry import MODELS
+
+
+def read_motion(portHandler, packetHandler, dxl_id, model):
+    """Reads position, speed and the Moving flag in one transaction.
+
+    Protocol 1.0 reads PRESENT_POSITION(36)..MOVING(46); Protocol 2.0 reads
+    MOVING(122)..PRESENT_POSITION(132), where Moving Status bit 0 also
+    counts as done. Returns (position, velocity, moving) or None.
+    """
+    spec = MODELS[model]
+    if spec["protocol"] == 1.0:
+        start, length = spec["block_start"], spec["ADDR_MOVING"] + 1 - spec["block_start"]
+    else:
+        start, length = spec["ADDR_MOVING"], spec["block_start"] + spec["block_length"] - spec["ADDR_MOVING"]
+    data, dxl_comm_result, dxl_error = packetHandler.readTxRx(portHandler, dxl_id, start, length)
+    if dxl_comm_result != COMM_SUCCESS or len(data) < length:
+        return None
+
+    if spec["protocol"] == 1.0:
+        sample = spec["decode"](data[:spec["block_length"]])
+        moving = data[-1]
+    else:
+        sample = spec["decode"](data[-spec["block_length"]:])
+        moving = data[0] and not data[1] & 1
+    return sample.position, sample.velocity, bool(moving)
+
+
+def wait_for_goal(portHandler, packetHandler, dxl_id, model, goal, threshold, speed=None,
+                  timeout=10.0, min_interval=0.005, max_interval=0.25, stall_time=0.1, on_sample=None):
+    """Blocks until the servo is within threshold ticks of goal.
+
+    After each poll the next one is scheduled at half the predicted time to
+    arrival. The prediction uses the present speed, or the commanded `speed`
+    (native units) while the servo is still picking up. A long move is thus
+    polled a handful of times, and the final approach every min_interval.
+    Gives up early once the servo has reported being stopped short of the
+    goal for stall_time seconds (blocked, or the goal is out of range).
+    Returns (reached, last position, number of polls).
+    """
+    spec = MODELS[model]
+    ticks_per_rev = spec["position_range"] * 360.0 / spec["position_degrees"]
+    ticks_per_s_per_unit = spec["rpm_per_unit"] / 60.0 * ticks_per_rev
+
+    deadline = time.perf_counter() + timeout
+    position = None
+    polls = 0
+    stopped_since = None
+    while True:
+        motion = read_motion(portHandler, packetHandler, dxl_id, model)
+        polls += 1
+        interval = min_interval
+        if motion is not None:
+            position, velocity, moving = motion
+            if on_sample is not None:
+                on_sample(position)
+
+            remaining = abs(goal - position)
+            if remaining <= threshold:
+                return True, position, polls
+            if moving:
+                stopped_since = None
+            elif stopped_since is None:
+                stopped_since = time.perf_counter()
+            elif time.perf_counter() - stopped_since >= stall_time:
+                return False, position, polls
+
+            rate = abs(velocity) or (speed or 0)
+            if rate:
+                interval = remaining / (rate * ticks_per_s_per_unit) / 2
+            interval = min(max(interval, min_interval), max_interval)
+
+        now = time.perf_counter()
+        if now >= deadline:
+            return False, position, polls
+        time.sleep(min(interval, deadline - now))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Samples several serial adapters at once, on one shared timeline.
+
+Each port gets its own worker thread. All of them tick on the same
+RateScheduler epoch, so record n on every bus belongs to the same nominal
+instant and the time columns line up across buses. The workers spend most
+of their time in serial reads and writes, which release the GIL, so adding
+an adapter adds throughput instead of queueing behind the other bus.
+"""
+
+import threading
+import time
+from dynamixel_sdk import *
+from acquisition import RingBuffer
+from rate_scheduler import RateScheduler
+from dxl_sync_read import SyncTelemetry
+from dxl_bulk_read import BulkTelemetry
+from dxl_baud_manager import find_baudrate
+
+# ---------------- Settings ----------------
+# (port, protocol, baud rate, [(ID, model), ...]) per USB adapter
+BUSES = [
+    ('com6', 1.0, 1000000, [(101, "AX-12A")]),
+    ('com5', 2.0, 57600, [(3, "XC330")]),
+]
+SAMPLE_RATE_HZ          = 50
+DURATION                = 10.0   # seconds
+START_LEAD              = 0.05   # time given to every worker to be waiting before the first tick
+
+
+class BusWorker(threading.Thread):
+    """Owns one port and samples all of its servos every tick"""
+
+    def __init__(self, portHandler, packetHandler, servos, rate_hz, capacity=1 << 16):
+        super().__init__(daemon=True, name=f"bus-{portHandler.getPortName()}")
+        self.portHandler = portHandler
+        self.dxl_ids = [dxl_id for dxl_id, _ in servos]
+        if packetHandler.getProtocolVersion() == 2.0:
+            # Sync Read covers one model's block, so a mixed chain takes one per model
+            by_model = {}
+            for dxl_id, model in servos:
+                by_model.setdefault(model, []).append(dxl_id)
+            self.readers = [(SyncTelemetry(portHandler, packetHandler, dxl_ids, model), dxl_ids)
+                            for model, dxl_ids in by_model.items()]
+        else:
+            self.readers = [(BulkTelemetry(portHandler, packetHandler, servos), self.dxl_ids)]
+        self.buffers = {dxl_id: RingBuffer(capacity) for dxl_id in self.dxl_ids}
+        self.scheduler = RateScheduler(rate_hz)
+        self.errors = 0
+        self.epoch = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        self.scheduler.start(self.epoch)
+        while not self._stop_event.is_set():
+            t = self.scheduler.wait()
+            for dxl_id, sample in self.read():
+                if sample is None:
+                    self.errors += 1
+                else:
+                    self.buffers[dxl_id].append((t, *sample))
+
+    def read(self):
+        """(ID, Telemetry or None) for every servo, in servo order"""
+        samples = {}
+        for reader, dxl_ids in self.readers:
+            samples.update(zip(dxl_ids, reader.read()[0]))
+        return [(dxl_id, samples[dxl_id]) for dxl_id in self.dxl_ids]
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class MultiBusAcquisition:
+    """One BusWorker per port, started on a common epoch.
+
+    buses: list of (portHandler, packetHandler, [(ID, model), ...]) with the
+    ports already open. buffer(port_name, ID) gives that servo's RingBuffer;
+    its time column is seconds since the shared epoch.
+    """
+
+    def __init__(self, buses, rate_hz, capacity=1 << 16):
+        self.workers = {portHandler.getPortName(): BusWorker(portHandler, packetHandler, servos, rate_hz, capacity)
+                        for portHandler, packetHandler, servos in buses}
+
+    def start(self, lead=START_LEAD):
+        epoch = time.perf_counter() + lead
+        for worker in self.workers.values():
+            worker.epoch = epoch
+            worker.start()
+
+    def stop(self):
+        for worker in self.workers.values():
+            worker.stop()
+
+    def buffer(self, port_name, dxl_id):
+        return self.workers[port_name].buffers[dxl_id]
+
+    def report(self):
+        lines = []
+        for port_name, worker in self.workers.items():
+            samples = sum(buffer.written for buffer in worker.buffers.values())
+            lines.append(f"{port_name}: {samples} samples, {worker.errors} failed | {worker.scheduler.report()}")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    buses = []
+    for port_name, protocol, baudrate, servos in BUSES:
+        portHandler = PortHandler(port_name)
+        packetHandler = PacketHandler(protocol)
+        if not portHandler.openPort() or find_baudrate(portHandler, packetHandler, servos[0][0], baudrate) is None:
+            print(f"{port_name}: no servo found, skipped")
+            continue
+        buses.append((portHandler, packetHandler, servos))
+    if not buses:
+        quit()
+
+    acquisition = MultiBusAcquisition(buses, SAMPLE_RATE_HZ)
+    start = time.perf_counter()
+    acquisition.start()
+    time.sleep(DURATION)
+    acquisition.stop()
+    elapsed = time.perf_counter() - start
+
+    print(acquisition.report())
+    total = sum(buffer.written for worker in acquisition.workers.values() for buffer in worker.buffers.values())
+    print(f"Aggregate: {total / elapsed:.1f} samples/s over {len(buses)} bus(es)")
+    for portHandler, _, _ in buses:
+        portHandler.closePort()
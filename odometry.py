@@ -0,0 +1,63 @@
+from dxl_telemetry import MODELS
+
+
+def max_unaliased_rpm(sample_rate_hz):
+    """Fastest rotation whose position can be unwrapped from position alone.
+
+    Above this, a sample moves more than half a turn and the wrap direction
+    is decided by the speed reading alone.
+    """
+    return 180.0 * sample_rate_hz / 6.0
+
+
+class Odometer:
+    """Turns wrapped present-position readings into a cumulative angle.
+
+    Each step takes the position change, wrapped to the whole turn
+    nearest the change the speed reading predicts. The turn is
+    position_range ticks over position_degrees, so the AX/RX 60° dead zone is
+    counted. When position and speed disagree by more than max_mismatch
+    degrees (a reading inside the dead zone, a lost sample), the step follows
+    the speed instead and `mismatches` is incremented. `alias_risk` counts
+    steps whose predicted move exceeded half a turn, i.e. the sample rate was
+    too low for the speed.
+    """
+
+    def __init__(self, model, max_mismatch=90.0):
+        spec = MODELS[model]
+        self.degrees_per_tick = spec["position_degrees"] / spec["position_range"]
+        self.degrees_per_s_per_unit = spec["rpm_per_unit"] * 6.0
+        self.max_mismatch = max_mismatch
+        self.reset()
+
+    def reset(self):
+        self.angle = 0.0
+        self.last = None        # (time, measured angle, velocity)
+        self.mismatches = 0
+        self.alias_risk = 0
+
+    @property
+    def revolutions(self):
+        return self.angle / 360.0
+
+    def update(self, t, position, velocity):
+        """Adds one sample (seconds, raw position ticks, signed native speed) and returns the angle in degrees"""
+        measured = position * self.degrees_per_tick
+        if self.last is None:
+            self.last = (t, measured, velocity)
+            return self.angle
+
+        last_t, last_measured, last_velocity = self.last
+        expected = (velocity + last_velocity) / 2 * self.degrees_per_s_per_unit * (t - last_t)
+        if abs(expected) >= 180.0:
+            self.alias_risk += 1
+
+        change = measured - last_measured
+        delta = change + 360.0 * round((expected - change) / 360.0)
+        if abs(delta - expected) > self.max_mismatch:
+            self.mismatches += 1
+            delta = expected
+
+        self.angle += delta
+        self.last = (t, measured, velocity)
+        return self.angle
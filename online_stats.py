@@ -0,0 +1,122 @@
+import math
+import numpy as np
+
+
+class RunningStats:
+    """Constant-memory summary of a stream of values.
+
+    Mean and variance follow Welford's update, and batches are merged with
+    Chan's formula, so long runs do not lose precision. Percentiles come from
+    a log-bucketed sketch in which every bucket spans a factor of
+    (1 + accuracy) / (1 - accuracy). Any percentile is therefore within
+    `accuracy` relative error, and the bucket count depends on the range of
+    the values, not how many there are. All figures are available at any
+    time while the stream is running.
+    """
+
+    __slots__ = ("count", "mean", "m2", "min", "max", "zeros", "positive", "negative", "log_gamma", "floor")
+
+    def __init__(self, accuracy=0.01, floor=1e-9):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.zeros = 0              # |value| below floor
+        self.positive = {}          # bucket index -> count
+        self.negative = {}
+        self.log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+        self.floor = floor
+
+    def update(self, value):
+        """Adds one value"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        magnitude = abs(value)
+        if magnitude < self.floor:
+            self.zeros += 1
+            return
+        buckets = self.positive if value > 0 else self.negative
+        index = math.ceil(math.log(magnitude) / self.log_gamma)
+        buckets[index] = buckets.get(index, 0) + 1
+
+    def update_many(self, values):
+        """Adds an array of values in one step"""
+        values = np.asarray(values, dtype=float).ravel()
+        count = len(values)
+        if count == 0:
+            return
+        mean = values.mean()
+        total = self.count + count
+        delta = mean - self.mean
+        self.m2 += ((values - mean) ** 2).sum() + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        magnitude = np.abs(values)
+        nonzero = magnitude >= self.floor
+        self.zeros += count - int(nonzero.sum())
+        indices = np.ceil(np.log(magnitude[nonzero]) / self.log_gamma).astype(np.int64)
+        signs = values[nonzero] > 0
+        for buckets, selected in ((self.positive, indices[signs]), (self.negative, indices[~signs])):
+            for index, n in zip(*np.unique(selected, return_counts=True)):
+                buckets[int(index)] = buckets.get(int(index), 0) + int(n)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def _bucket_value(self, index):
+        # Midpoint of the bucket's range, in the sketch's relative sense
+        return 2 * math.exp(index * self.log_gamma) / (1 + math.exp(self.log_gamma))
+
+    def percentile(self, q):
+        """Approximate q-quantile (0 ≤ q ≤ 1), or nan before the first value"""
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return max(self.min, -self._bucket_value(index))
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return min(self.max, self._bucket_value(index))
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p99": self.percentile(0.99),
+        }
+
+    def report(self, label, unit="", precision=2):
+        if self.count == 0:
+            return f"{label}: no data"
+        s = self.as_dict()
+        return (f"{label}: mean={s['mean']:.{precision}f}{unit} std={s['std']:.{precision}f} "
+                f"min={s['min']:.{precision}f} p50={s['p50']:.{precision}f} p99={s['p99']:.{precision}f} "
+                f"max={s['max']:.{precision}f} (n={s['count']})")
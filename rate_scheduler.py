@@ -0,0 +1,83 @@
+import time
+
+SKIP = "skip"           # drop missed deadlines and stay on the original phase
+CATCH_UP = "catch_up"   # run missed ticks back to back until on time again
+
+
+class RateScheduler:
+    """Paces an acquisition loop on absolute monotonic deadlines.
+
+    Deadlines are start + n * period, so bus latency and printing inside the
+    loop body never accumulate into drift. Call wait() at the top of every
+    iteration; it returns the nominal tick time in seconds since start().
+    """
+
+    def __init__(self, rate_hz, policy=SKIP, spin_time=0.002):
+        if policy not in (SKIP, CATCH_UP):
+            raise ValueError(f"Unknown missed-deadline policy: {policy}")
+        self.period = 1.0 / rate_hz
+        self.policy = policy
+        self.spin_time = spin_time      # busy-wait the last few ms, sleep() is coarse on Windows
+        self.start()
+
+    def start(self, start_time=None):
+        """Resets the timeline and statistics; the first tick is due at start_time.
+
+        start_time is a perf_counter() value and defaults to now. Schedulers
+        given the same start_time and rate tick on a shared timeline.
+        """
+        self.start_time = time.perf_counter() if start_time is None else start_time
+        self.tick = 0
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.jitter_sum = 0.0
+        self.jitter_max = 0.0
+
+    def wait(self):
+        """Blocks until the next deadline and returns its nominal time since start()"""
+        deadline = self.start_time + self.tick * self.period
+        now = time.perf_counter()
+
+        if now - deadline >= self.period:
+            # The previous body ran past at least one whole period
+            self.overruns += 1
+            if self.policy == SKIP:
+                missed = int((now - deadline) / self.period) + 1
+                self.skipped += missed
+                self.tick += missed
+                deadline += missed * self.period
+
+        remaining = deadline - now
+        if remaining > self.spin_time:
+            time.sleep(remaining - self.spin_time)
+        while time.perf_counter() < deadline:
+            pass
+
+        jitter = time.perf_counter() - deadline
+        self.jitter_sum += jitter
+        if jitter > self.jitter_max:
+            self.jitter_max = jitter
+
+        nominal = self.tick * self.period
+        self.tick += 1
+        self.ticks += 1
+        return nominal
+
+    def stats(self):
+        """Returns tick, overrun and jitter counters (jitter in seconds)"""
+        return {
+            "rate_hz": 1.0 / self.period,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "jitter_mean": self.jitter_sum / self.ticks if self.ticks else 0.0,
+            "jitter_max": self.jitter_max,
+        }
+
+    def report(self):
+        """One-line summary for the end of a run"""
+        s = self.stats()
+        return (f"{s['ticks']} ticks at {s['rate_hz']:.0f} Hz | overruns={s['overruns']} "
+                f"skipped={s['skipped']} | jitter mean={s['jitter_mean'] * 1000:.2f} ms "
+                f"max={s['jitter_max'] * 1000:.2f} ms")
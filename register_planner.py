@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Reads register groups at different rates without disturbing the fast path.
+
+Every group declares its own rate. The fastest groups are read on every
+tick. Each slower group gets a fixed slot, one tick out of every
+base_rate / rate_hz, and the slots are spread so that no tick carries more
+than its share. Before sampling starts, plan() estimates the wire time of
+every transaction from the baud rate. A group that cannot fit in the time
+the fast reads leave spare is rejected then, not discovered as overruns.
+The demo below samples the telemetry block at 100 Hz and the health
+registers at 1 Hz.
+"""
+
+import math
+import time
+from collections import namedtuple
+from dynamixel_sdk import *
+from dxl_telemetry import MODELS
+from dxl_baud_manager import find_baudrate
+from acquisition import AcquisitionThread
+
+# ---------------- Settings ----------------
+PROTOCOL_VERSION        = 2.0
+DXL_MODEL               = "XC330"
+DXL_ID                  = 3
+BAUDRATE                = 57600
+DEVICENAME              = 'com6'
+
+FAST_RATE_HZ            = 100
+HEALTH_RATE_HZ          = 1
+# Polled health registers; hardware errors already show in every status packet's error byte
+HEALTH_REGISTERS        = ("voltage", "temperature")
+DURATION                = 5.0     # seconds
+USB_LATENCY             = 0.001   # per transaction, with the adapter's latency timer at 1 ms
+
+# Packet bytes around the data of a read: (instruction packet, status packet)
+READ_OVERHEAD = {1.0: (8, 6), 2.0: (14, 11)}
+
+# decode(data) -> {name: value} for the bytes read from address..address+length
+RegisterGroup = namedtuple("RegisterGroup", ["name", "address", "length", "rate_hz", "decode"])
+
+
+def telemetry_group(model, rate_hz):
+    """The model's present-state block, decoded to a Telemetry sample"""
+    spec = MODELS[model]
+    return RegisterGroup("telemetry", spec["block_start"], spec["block_length"], rate_hz,
+                         lambda data: {"telemetry": spec["decode"](data)})
+
+
+def _register_decoder(start, registers):
+    def decode(data):
+        return {name: int.from_bytes(bytes(data[address - start:address - start + length]), "little")
+                for name, address, length in registers}
+    return decode
+
+
+def health_groups(model, rate_hz, names=None):
+    """The model's health registers (or the named ones), one group per contiguous run"""
+    registers = sorted(((name, address, length) for name, (address, length) in MODELS[model]["health"].items()
+                        if names is None or name in names), key=lambda register: register[1])
+    runs = []
+    for register in registers:
+        if runs and runs[-1][-1][1] + runs[-1][-1][2] == register[1]:
+            runs[-1].append(register)
+        else:
+            runs.append([register])
+    groups = []
+    for run in runs:
+        start, end = run[0][1], run[-1][1] + run[-1][2]
+        groups.append(RegisterGroup("+".join(name for name, _, _ in run), start, end - start, rate_hz,
+                                    _register_decoder(start, run)))
+    return groups
+
+
+def transaction_time(protocol, baudrate, length, latency=USB_LATENCY):
+    """Estimated seconds for one read of length bytes: both packets at 10 bits a byte, plus latency"""
+    instruction, status = READ_OVERHEAD[protocol]
+    return (instruction + status + length) * 10 / baudrate + latency
+
+
+def _span(groups):
+    start = min(group.address for group in groups)
+    return start, max(group.address + group.length for group in groups) - start
+
+
+def plan(groups, protocol, baudrate, latency=USB_LATENCY):
+    """Assigns every group to its ticks.
+
+    The base rate is the fastest group's. A slower group is either read on
+    its own in its slot, or, when that is cheaper, folded into an every-tick
+    read by widening it to cover both. Returns (schedule, load): schedule
+    has one entry per tick of the repeating cycle, a list of reads, each a
+    list of groups read in one transaction. load is the estimated bus time
+    of each tick. Raises ValueError when the fast groups alone exceed the
+    period, or a slower group fits in no slot.
+    """
+    base_rate = max(group.rate_hz for group in groups)
+    period = 1.0 / base_rate
+    divisors = {group.name: max(1, round(base_rate / group.rate_hz)) for group in groups}
+    cycle = math.lcm(*divisors.values())
+
+    def cost(groups):
+        return transaction_time(protocol, baudrate, _span(groups)[1], latency)
+
+    fast = [group for group in groups if divisors[group.name] == 1]
+    slow = sorted((group for group in groups if divisors[group.name] > 1),
+                  key=lambda group: (divisors[group.name], -cost([group])))
+    schedule = [[[group] for group in fast] for _ in range(cycle)]
+    load = [sum(cost([group]) for group in fast)] * cycle
+    if load[0] > period:
+        raise ValueError(f"Every-tick reads take {load[0] * 1e3:.1f} ms, more than the "
+                         f"{period * 1e3:.1f} ms period at {baudrate} bit/s")
+
+    for group in slow:
+        # Cheapest way in: a read of its own, or widening one of the every-tick reads
+        host, extra = None, cost([group])
+        for index, read in enumerate(fast):
+            widened = cost([read, group]) - cost([read])
+            if widened < extra:
+                host, extra = index, widened
+
+        divisor = divisors[group.name]
+        phase = min(range(divisor), key=lambda phase: max(load[phase::divisor]))
+        if max(load[phase::divisor]) + extra > period:
+            raise ValueError(f"{group.name} (+{extra * 1e3:.1f} ms) does not fit the "
+                             f"{period * 1e3:.1f} ms period at {baudrate} bit/s; raise the baud rate "
+                             f"or lower the fast rate")
+        for tick in range(phase, cycle, divisor):
+            if host is None:
+                schedule[tick].append([group])
+            else:
+                schedule[tick][host] = schedule[tick][host] + [group]
+            load[tick] += extra
+    return schedule, load
+
+
+class MultiRateReader:
+    """Reads one servo's register groups on a plan() schedule, one tick per call.
+
+    read_sample() suits AcquisitionThread. It returns the telemetry group's
+    sample and stores every other value in `latest` as it arrives.
+    """
+
+    def __init__(self, portHandler, packetHandler, dxl_id, model, groups, latency=USB_LATENCY):
+        self.portHandler = portHandler
+        self.packetHandler = packetHandler
+        self.dxl_id = dxl_id
+        self.schedule, self.load = plan(groups, MODELS[model]["protocol"], portHandler.getBaudRate(), latency)
+        self.rate_hz = max(group.rate_hz for group in groups)
+        self.tick = 0
+        self.latest = {}        # register name -> last value read
+        self.errors = {group.name: 0 for group in groups}
+
+    def read(self):
+        """Reads this tick's groups; returns {name: value} for those that succeeded.
+
+        "status_error" holds the error byte of the last status packet: the
+        alarm bits on Protocol 1.0, bit 7 (hardware alert) on Protocol 2.0.
+        """
+        values = {}
+        for groups in self.schedule[self.tick % len(self.schedule)]:
+            start, length = _span(groups)
+            data, dxl_comm_result, dxl_error = self.packetHandler.readTxRx(
+                self.portHandler, self.dxl_id, start, length
+            )
+            if dxl_comm_result != COMM_SUCCESS or len(data) < length:
+                for group in groups:
+                    self.errors[group.name] += 1
+                continue
+            values["status_error"] = dxl_error
+            for group in groups:
+                offset = group.address - start
+                values.update(group.decode(data[offset:offset + group.length]))
+        self.tick += 1
+        self.latest.update(values)
+        return values
+
+    def read_sample(self):
+        return self.read().get("telemetry")
+
+    def report(self):
+        slots = {}
+        for tick, reads in enumerate(self.schedule):
+            for groups in reads:
+                for group in groups:
+                    slots.setdefault(group.name, []).append(tick)
+        parts = [f"{name} every {len(self.schedule) // len(ticks)} tick(s) from {ticks[0]}"
+                 for name, ticks in slots.items()]
+        return (f"{self.rate_hz} Hz base, {len(self.schedule)}-tick cycle | " + ", ".join(parts) +
+                f" | busiest tick {max(self.load) * 1e3:.1f} of {1e3 / self.rate_hz:.1f} ms")
+
+
+if __name__ == "__main__":
+    portHandler = PortHandler(DEVICENAME)
+    packetHandler = PacketHandler(PROTOCOL_VERSION)
+    if not portHandler.openPort():
+        print("Failed to open port")
+        quit()
+    if find_baudrate(portHandler, packetHandler, DXL_ID, BAUDRATE) is None:
+        print(f"DXL ID {DXL_ID} not found at any standard baud rate")
+        quit()
+
+    groups = [telemetry_group(DXL_MODEL, FAST_RATE_HZ)] + health_groups(DXL_MODEL, HEALTH_RATE_HZ, HEALTH_REGISTERS)
+    try:
+        reader = MultiRateReader(portHandler, packetHandler, DXL_ID, DXL_MODEL, groups)
+    except ValueError as error:
+        print(error)
+        portHandler.closePort()
+        quit()
+    print(reader.report())
+
+    acquisition = AcquisitionThread(reader.read_sample, reader.rate_hz)
+    acquisition.start()
+    time.sleep(DURATION)
+    acquisition.stop()
+    print(acquisition.scheduler.report())
+    print(f"{acquisition.buffer.written} telemetry samples | health: {reader.latest}")
+    if any(reader.errors.values()):
+        print(f"⚠ failed reads: {reader.errors}")
+    portHandler.closePort()
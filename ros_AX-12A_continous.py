@@ -1,4 +1,6 @@
 from dynamixel_sdk import *
+from dxl_latency_tuner import GoalWriter
+from dxl_baud_manager import find_baudrate
 import os
 import time
 
@@ -12,6 +14,7 @@ ADDR_MX_CCW_ANGLE_LIMIT    = 8
 ADDR_MX_TORQUE_LIMIT       = 34   
 
 PROTOCOL_VERSION           = 1.0
+DXL_MODEL                  = "AX-12A"
 DXL_ID                     = 101
 BAUDRATE                   = 57600
 DEVICENAME                 = 'com6'
@@ -48,8 +51,8 @@ packetHandler = PacketHandler(PROTOCOL_VERSION)
 if not portHandler.openPort():
     print("Failed to open port")
     quit()
-if not portHandler.setBaudRate(BAUDRATE):
-    print("Failed to set baudrate")
+if find_baudrate(portHandler, packetHandler, DXL_ID, BAUDRATE) is None:
+    print(f"DXL ID {DXL_ID} not found at any standard baud rate")
     quit()
 
 # Disable torque before setting limits
@@ -67,6 +70,8 @@ packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_TORQUE_LIMIT, DXL_TORQ
 
 packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_MOVING_SPEED, 0)
 
+goal_writer = GoalWriter(portHandler, packetHandler, DXL_ID, DXL_MODEL)
+
 print("  0 → Go to default position")
 print("  1 → Continuous clockwise rotation")
 print("  2 → Continuous anticlockwise rotation")
@@ -94,8 +99,8 @@ while True:
         packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_MX_TORQUE_ENABLE, TORQUE_ENABLE)
 
         # Set speed and goal
-        packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_MOVING_SPEED, DXL_MOVING_SPEED)
-        packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_GOAL_POSITION, DEFAULT_POSITION)
+        goal_writer.write(ADDR_MX_MOVING_SPEED, 2, DXL_MOVING_SPEED)
+        goal_writer.write(ADDR_MX_GOAL_POSITION, 2, DEFAULT_POSITION)
 
 
         # Print live position until target is reached
@@ -114,7 +119,7 @@ while True:
 
             if abs(dxl_present_position - DEFAULT_POSITION) < 20:
                 print("✅ Reached default position.")
-                packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_MOVING_SPEED, 0)
+                goal_writer.write(ADDR_MX_MOVING_SPEED, 2, 0)
                 break
 
             time.sleep(0.1)
@@ -123,18 +128,18 @@ while True:
         state = "CLOCKWISE"
         print("Continuous clockwise rotation...")
         # For continuous rotation: write speed only
-        packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_MOVING_SPEED, DXL_MOVING_SPEED)
+        goal_writer.write(ADDR_MX_MOVING_SPEED, 2, DXL_MOVING_SPEED)
 
     elif key == '2':
         state = "ANTICLOCKWISE"
         print("Continuous anticlockwise rotation...")
         # Negative speed = anticlockwise
-        packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_MOVING_SPEED, 1024 + DXL_MOVING_SPEED)
+        goal_writer.write(ADDR_MX_MOVING_SPEED, 2, 1024 + DXL_MOVING_SPEED)
 
     elif key == '3':
         state = "STOP"
         print("Stopping...")
-        packetHandler.write2ByteTxRx(portHandler, DXL_ID, ADDR_MX_MOVING_SPEED, 0)
+        goal_writer.write(ADDR_MX_MOVING_SPEED, 2, 0)
 
     else:
         print("Invalid input! Use 0, 1, 2, 3, or q.")
@@ -1,4 +1,9 @@
 from dynamixel_sdk import *
+from dxl_latency_tuner import GoalWriter
+from dxl_baud_manager import find_baudrate
+from dxl_register_mirror import RegisterMirror
+from motion_wait import wait_for_goal
+from dxl_broker import BrokerPort, BrokerPacketHandler
 import os
 import time
 
@@ -12,14 +17,17 @@ ADDR_CURRENT_LIMIT      = 38    # 2 bytes
 ADDR_OPERATING_MODE     = 11    # 1 byte
 
 PROTOCOL_VERSION        = 2.0
+DXL_MODEL               = "XC330"
 DXL_ID                  = 3
 BAUDRATE                = 57600
 DEVICENAME              = 'com6'
+BROKER                  = None    # address of a running dxl_broker.py, which then owns DEVICENAME
 
 TORQUE_ENABLE           = 1
 TORQUE_DISABLE          = 0
 DEFAULT_POSITION        = 100   # midpoint of 0–4095 range
 DEFAULT_VELOCITY        = 400     # small velocity value for safe testing
+POSITION_THRESHOLD      = 20      # ticks tolerance
 
 # ---------------- Utility for getch ----------------
 if os.name == 'nt':
@@ -38,30 +46,33 @@ else:
         return ch
 
 # ---------------- Init ----------------
-portHandler = PortHandler(DEVICENAME)
-packetHandler = PacketHandler(PROTOCOL_VERSION)
+if BROKER:
+    portHandler = BrokerPort(BROKER)
+    packetHandler = BrokerPacketHandler(PROTOCOL_VERSION)
+else:
+    portHandler = PortHandler(DEVICENAME)
+    packetHandler = PacketHandler(PROTOCOL_VERSION)
 
 if not portHandler.openPort():
     print("Failed to open port")
     quit()
-if not portHandler.setBaudRate(BAUDRATE):
-    print("Failed to set baudrate")
+if find_baudrate(portHandler, packetHandler, DXL_ID, BAUDRATE) is None:
+    print(f"DXL ID {DXL_ID} not found at any standard baud rate")
     quit()
 
-# Disable torque before setting mode
-packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_DISABLE)
+mirror = RegisterMirror(portHandler, packetHandler, DXL_ID, DXL_MODEL)
 
 # Set to Position Control Mode (3)
-dxl_comm_result, dxl_error = packetHandler.write1ByteTxRx(
-    portHandler, DXL_ID, ADDR_OPERATING_MODE, 3
-)
+dxl_comm_result, dxl_error = mirror.write_eeprom(ADDR_OPERATING_MODE, 1, 3)
 if dxl_comm_result != COMM_SUCCESS:
     print("Comm error:", packetHandler.getTxRxResult(dxl_comm_result))
 elif dxl_error != 0:
     print("Packet error:", packetHandler.getRxPacketError(dxl_error))
 
 # Enable torque
-packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_ENABLE)
+mirror.write(ADDR_TORQUE_ENABLE, 1, TORQUE_ENABLE)
+
+goal_writer = GoalWriter(portHandler, packetHandler, DXL_ID, DXL_MODEL)
 
 print("  0 → Go to default position")
 print("  1 → Continuous clockwise rotation")
@@ -83,63 +94,47 @@ while True:
         print("➡ Going to default position...")
 
         # Switch to Position Control
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_DISABLE)
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_OPERATING_MODE, 3)  # Position Mode
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_ENABLE)
+        mirror.write_eeprom(ADDR_OPERATING_MODE, 1, 3)  # Position Mode
+        mirror.write(ADDR_TORQUE_ENABLE, 1, TORQUE_ENABLE)
 
         # Send goal position
-        packetHandler.write4ByteTxRx(portHandler, DXL_ID, ADDR_GOAL_POSITION, DEFAULT_POSITION)
-
-        # Monitor until reached
-        while True:
-            dxl_present_position, dxl_comm_result, dxl_error = packetHandler.read4ByteTxRx(
-                portHandler, DXL_ID, ADDR_PRESENT_POSITION
-            )
-            if dxl_comm_result != COMM_SUCCESS:
-                print("Comm error:", packetHandler.getTxRxResult(dxl_comm_result))
-                break
-            elif dxl_error != 0:
-                print("Error:", packetHandler.getRxPacketError(dxl_error))
-                break
-
-            print(f"Current Position: {dxl_present_position}")
-
-            if abs(dxl_present_position - DEFAULT_POSITION) < 20:
-                print(" Reached default position.")
-                break
+        goal_writer.write(ADDR_GOAL_POSITION, 4, DEFAULT_POSITION)
 
-            time.sleep(0.1)
+        # Monitor until reached, polling more often as it gets close
+        reached, _, _ = wait_for_goal(
+            portHandler, packetHandler, DXL_ID, DXL_MODEL, DEFAULT_POSITION, POSITION_THRESHOLD,
+            on_sample=lambda position: print(f"Current Position: {position}"),
+        )
+        print(" Reached default position." if reached else " Stopped before the default position.")
 
     elif key == '1':
         state = "CLOCKWISE"
         print("Continuous clockwise rotation...")
 
         # Switch to Velocity Control
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_DISABLE)
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_OPERATING_MODE, 1)  # Velocity Mode
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_ENABLE)
+        mirror.write_eeprom(ADDR_OPERATING_MODE, 1, 1)  # Velocity Mode
+        mirror.write(ADDR_TORQUE_ENABLE, 1, TORQUE_ENABLE)
 
         # Positive velocity = clockwise
-        packetHandler.write4ByteTxRx(portHandler, DXL_ID, ADDR_GOAL_VELOCITY, DEFAULT_VELOCITY)
+        goal_writer.write(ADDR_GOAL_VELOCITY, 4, DEFAULT_VELOCITY)
 
     elif key == '2':
         state = "ANTICLOCKWISE"
         print("Continuous anticlockwise rotation...")
 
         # Switch to Velocity Control
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_DISABLE)
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_OPERATING_MODE, 1)  # Velocity Mode
-        packetHandler.write1ByteTxRx(portHandler, DXL_ID, ADDR_TORQUE_ENABLE, TORQUE_ENABLE)
+        mirror.write_eeprom(ADDR_OPERATING_MODE, 1, 1)  # Velocity Mode
+        mirror.write(ADDR_TORQUE_ENABLE, 1, TORQUE_ENABLE)
 
         # Negative velocity = anticlockwise
         # Must be written as signed 32-bit integer
         velocity_value = (1 << 32) + (-DEFAULT_VELOCITY)  # convert negative to unsigned 32-bit
-        packetHandler.write4ByteTxRx(portHandler, DXL_ID, ADDR_GOAL_VELOCITY, velocity_value)
+        goal_writer.write(ADDR_GOAL_VELOCITY, 4, velocity_value)
 
     elif key == '3':
         state = "STOP"
         print("Stopping...")
-        packetHandler.write4ByteTxRx(portHandler, DXL_ID, ADDR_GOAL_VELOCITY, 0)
+        goal_writer.write(ADDR_GOAL_VELOCITY, 4, 0)
 
     else:
         print("Invalid input! Use 0, 1, 2, 3, or q.")
@@ -0,0 +1,125 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+MEAN = "mean"
+MEDIAN = "median"
+
+
+class SpikeFilter:
+    """Streaming spike rejection for RPM (or any scalar) samples.
+
+    Each new value is compared with the centre (running mean or median) of
+    the last `window` filtered outputs:
+      - values above `clamp` are replaced by the centre (clamp=None disables)
+      - values more than `spike_limit` above the centre are replaced by it
+      - with reject_drops, values more than `spike_limit` below it are too
+    The filtered value then enters the window. update() does constant work per
+    sample; filter_array() re-runs the same rules over a recorded array.
+    """
+
+    def __init__(self, window=5, clamp=70.0, spike_limit=30.0, center=MEAN, reject_drops=False):
+        if center not in (MEAN, MEDIAN):
+            raise ValueError(f"Unknown centre estimate: {center}")
+        self.window = window
+        self.clamp = clamp
+        self.spike_limit = spike_limit
+        self.center = center
+        self.reject_drops = reject_drops
+        self.reset()
+
+    def reset(self):
+        self.values = [0.0] * self.window
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def settings(self):
+        return dict(window=self.window, clamp=self.clamp, spike_limit=self.spike_limit,
+                    center=self.center, reject_drops=self.reject_drops)
+
+    def current_center(self, fallback):
+        """Centre of the filtered window, or fallback while it is empty"""
+        if self.count == 0:
+            return fallback
+        if self.center == MEAN:
+            return self.total / self.count
+        ordered = sorted(self.values[:self.count])
+        middle = self.count // 2
+        if self.count % 2:
+            return ordered[middle]
+        return (ordered[middle - 1] + ordered[middle]) / 2
+
+    def update(self, value):
+        """Filters one sample and returns the value to keep"""
+        value = float(value)
+        center = self.current_center(value)
+        if self.clamp is not None and value > self.clamp:
+            value = center
+        if value > center + self.spike_limit or (self.reject_drops and value < center - self.spike_limit):
+            value = center
+
+        # Running sum: the oldest slot is still 0.0 while the window fills
+        self.total += value - self.values[self.index]
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.window
+        if self.count < self.window:
+            self.count += 1
+        return value
+
+    def filter_array(self, values, chunk=64):
+        """Filters a whole recorded array from a fresh state.
+
+        Gives exactly the output of calling update() on every element. Runs of
+        accepted samples are checked with NumPy in one go; only a rejected
+        sample (whose replacement changes later windows) restarts the scan.
+        """
+        values = np.asarray(values, dtype=float)
+        out = values.copy()
+        n = len(values)
+        N = self.window
+
+        # Partially filled window: short enough to run the streaming rules
+        head = SpikeFilter(**self.settings())
+        for i in range(min(N, n)):
+            out[i] = head.update(values[i])
+        total = head.total
+
+        pos = N
+        step = chunk
+        while pos < n:
+            end = min(n, pos + step)
+            segment = values[pos:end]
+            # Previous N outputs followed by the segment, assuming it is all accepted
+            tentative = np.concatenate((out[pos - N:pos], segment))
+
+            if self.center == MEAN:
+                # Same summation order as update(): total += new - oldest
+                sums = np.cumsum(np.concatenate(([total], tentative[N:] - tentative[:-N])))
+                center = sums[:-1] / N
+            else:
+                center = np.median(sliding_window_view(tentative, N)[:-1], axis=1)
+
+            kept = segment
+            if self.clamp is not None:
+                kept = np.where(segment > self.clamp, center, segment)
+            rejected = kept > center + self.spike_limit
+            if self.reject_drops:
+                rejected |= kept < center - self.spike_limit
+            kept = np.where(rejected, center, kept)
+
+            changed = np.flatnonzero(kept != segment)
+            if len(changed) == 0:
+                if self.center == MEAN:
+                    total = sums[-1]
+                pos = end
+                step = min(step * 2, 1 << 16)
+                continue
+
+            j = changed[0]
+            out[pos + j] = kept[j]
+            if self.center == MEAN:
+                total = sums[j] + (kept[j] - out[pos + j - N])
+            pos += j + 1
+            step = chunk
+
+        return out
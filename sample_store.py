@@ -0,0 +1,74 @@
+import numpy as np
+
+
+def _record_class(fields):
+    class Record:
+        __slots__ = fields
+
+        def __init__(self, *values):
+            for name, value in zip(fields, values):
+                setattr(self, name, value)
+
+        def __repr__(self):
+            return "Record(" + ", ".join(f"{name}={getattr(self, name)!r}" for name in fields) + ")"
+
+    return Record
+
+
+class SampleStore:
+    """Growable typed columns for per-sample values kept in memory.
+
+    Each field is a preallocated NumPy column of its own dtype, doubled when
+    full, so a float32 value costs 4 bytes rather than a boxed Python float
+    plus a list slot. store["rpm"] is a view of the filled part of a column and
+    goes straight into plt.plot() or .mean(); store[i] is one row as a
+    __slots__ record with one attribute per field.
+    """
+
+    __slots__ = ("fields", "columns", "size", "record")
+
+    def __init__(self, fields, capacity=4096):
+        """fields: sequence of (name, dtype) pairs, in append() order"""
+        self.fields = tuple(name for name, _ in fields)
+        self.columns = [np.empty(capacity, dtype=dtype) for _, dtype in fields]
+        self.size = 0
+        self.record = _record_class(self.fields)
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, needed):
+        capacity = len(self.columns[0])
+        while capacity < needed:
+            capacity *= 2
+        for index, column in enumerate(self.columns):
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[index] = grown
+
+    def append(self, *values):
+        """Adds one sample, one value per field in declaration order"""
+        if self.size == len(self.columns[0]):
+            self._grow(self.size + 1)
+        for column, value in zip(self.columns, values):
+            column[self.size] = value
+        self.size += 1
+
+    def extend(self, *columns):
+        """Adds many samples at once, one array per field"""
+        count = len(columns[0])
+        if self.size + count > len(self.columns[0]):
+            self._grow(self.size + count)
+        for column, values in zip(self.columns, columns):
+            column[self.size:self.size + count] = values
+        self.size += count
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[self.fields.index(key)][:self.size]
+        if not -self.size <= key < self.size:
+            raise IndexError("sample index out of range")
+        return self.record(*(column[key % self.size].item() for column in self.columns))
+
+    def nbytes(self):
+        return sum(column[:self.size].nbytes for column in self.columns)
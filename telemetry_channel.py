@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Publishes telemetry to other processes through shared memory.
+
+The acquisition script owns a SharedRingBuffer created under a name.
+Logging, plotting or analysis processes attach to that name and read the
+same records in place, with no pickling, pipes or copies, each at its own
+pace. Run this script as a consumer to watch a channel. It prints the
+per-servo sample rate and mean velocity once a second.
+"""
+
+import time
+import numpy as np
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from acquisition import RECORD_FIELDS, RingBuffer
+
+# ---------------- Settings ----------------
+CHANNEL_NAME            = 'dxl_telemetry'
+REPORT_PERIOD           = 1.0
+
+# Fixed record layout: RingBuffer records with the servo ID after the time
+CHANNEL_FIELDS = ("time", "id") + RECORD_FIELDS[1:]
+# int64 header: records written, capacity, record width
+HEADER_SIZE = 64
+
+
+def _attach(name):
+    try:
+        return SharedMemory(name=name, track=False)     # Python 3.13+
+    except TypeError:
+        shm = SharedMemory(name=name)
+        # Before 3.13 every attaching process registers the block and unlinks it on exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedRingBuffer(RingBuffer):
+    """RingBuffer whose records and write counter live in named shared memory.
+
+    SharedRingBuffer(name, capacity) creates the channel; the publisher is
+    its only writer and unlinks it on close(). SharedRingBuffer.attach(name)
+    opens it from another process. read() returns a view into the shared
+    block rather than a copy, ending at the wrap point; the rest comes on the
+    next call. Rows in a view stay valid until the publisher laps them,
+    `capacity` records later, so copy() anything that is kept for longer.
+    """
+
+    def __init__(self, name=None, capacity=1 << 16, width=len(CHANNEL_FIELDS), _shm=None):
+        self.owner = _shm is None
+        if self.owner:
+            self.shm = SharedMemory(name=name, create=True, size=HEADER_SIZE + capacity * width * 8)
+        else:
+            self.shm = _shm
+        self.header = np.ndarray(3, dtype=np.int64, buffer=self.shm.buf)
+        if self.owner:
+            self.header[:] = (0, capacity, width)
+        self.capacity, width = int(self.header[1]), int(self.header[2])
+        self.data = np.ndarray((self.capacity, width), dtype=np.float64, buffer=self.shm.buf, offset=HEADER_SIZE)
+
+    @classmethod
+    def attach(cls, name=CHANNEL_NAME):
+        return cls(_shm=_attach(name))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def written(self):
+        return int(self.header[0])
+
+    @written.setter
+    def written(self, value):
+        # Records are stored before the counter moves, so readers never see a half-written row
+        self.header[0] = value
+
+    def extend(self, records):
+        """Adds a 2-D array of records with one counter update"""
+        count = len(records)
+        if count > self.capacity:
+            records = records[-self.capacity:]
+            self.written += count - self.capacity
+            count = self.capacity
+        first = self.written % self.capacity
+        head = min(count, self.capacity - first)
+        self.data[first:first + head] = records[:head]
+        self.data[:count - head] = records[head:]
+        self.written += count
+
+    def publish(self, dxl_id, records):
+        """Adds (time, position, velocity, effort) records from one servo"""
+        self.extend(np.insert(records, 1, dxl_id, axis=1))
+
+    def read(self, cursor):
+        """Returns (view of records newer than cursor, new cursor, number of records dropped)"""
+        end = self.written
+        start = max(cursor, end - self.capacity)
+        first = start % self.capacity
+        stop = first + min(end - start, self.capacity - first)
+        return self.data[first:stop], start + stop - first, start - cursor
+
+    def close(self):
+        # The numpy views must go before the block can be closed
+        del self.data, self.header
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+if __name__ == "__main__":
+    try:
+        channel = SharedRingBuffer.attach(CHANNEL_NAME)
+    except FileNotFoundError:
+        print(f"No channel named {CHANNEL_NAME!r}; start the publisher first")
+        quit()
+
+    print(f"Attached to {CHANNEL_NAME}: {channel.capacity} records of {', '.join(CHANNEL_FIELDS)}")
+    cursor = channel.written
+    try:
+        while True:
+            time.sleep(REPORT_PERIOD)
+            counts = {}
+            velocity = {}
+            while True:
+                records, cursor, dropped = channel.read(cursor)
+                if dropped:
+                    print(f"⚠ {dropped} records lapped before they were read")
+                if len(records) == 0:
+                    break
+                for dxl_id in np.unique(records[:, 1]):
+                    rows = records[records[:, 1] == dxl_id]
+                    counts[int(dxl_id)] = counts.get(int(dxl_id), 0) + len(rows)
+                    velocity[int(dxl_id)] = velocity.get(int(dxl_id), 0.0) + rows[:, 3].sum()
+            for dxl_id, count in sorted(counts.items()):
+                print(f"[ID:{dxl_id:03d}] {count / REPORT_PERIOD:.1f} samples/s | mean velocity {velocity[dxl_id] / count:.1f}")
+    except KeyboardInterrupt:
+        pass
+    channel.close()
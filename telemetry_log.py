@@ -0,0 +1,109 @@
+import struct
+import numpy as np
+from acquisition import RECORD_FIELDS
+
+# ---------------- File layout ----------------
+# 256-byte header followed by little-endian float64 records:
+#   0:8    magic
+#   8:16   uint64 number of valid records (updated on every flush)
+#   16:20  uint32 number of fields
+#   20:256 comma-separated field names, NUL padded
+LOG_MAGIC = b"DXLLOG01"
+HEADER_SIZE = 256
+
+
+def record_dtype(fields):
+    return np.dtype([(name, "<f8") for name in fields])
+
+
+class TelemetryLogWriter:
+    """Streams fixed-width records to disk during a run.
+
+    Records are staged in a preallocated chunk and written out whenever it
+    fills, so a crash loses at most one chunk. The file itself is grown in
+    large preallocated steps rather than per write.
+    """
+
+    def __init__(self, path, fields=RECORD_FIELDS, chunk_size=1024, preallocate=1 << 16):
+        self.path = path
+        self.fields = tuple(fields)
+        self.dtype = record_dtype(self.fields)
+        self.chunk = np.zeros(chunk_size, dtype=self.dtype)
+        self.chunk_view = self.chunk.view("<f8").reshape(chunk_size, len(self.fields))
+        self.pending = 0
+        self.count = 0
+        self.preallocate = preallocate
+
+        names = ",".join(self.fields).encode("ascii")
+        if len(names) > HEADER_SIZE - 20:
+            raise ValueError("Too many field names for the log header")
+
+        self.file = open(path, "w+b")
+        self.file.write(LOG_MAGIC + struct.pack("<QI", 0, len(self.fields)) + names.ljust(HEADER_SIZE - 20, b"\0"))
+        self.allocated = 0
+        self._reserve(preallocate)
+
+    def _reserve(self, records):
+        if records > self.allocated:
+            self.allocated = max(records, self.allocated + self.preallocate)
+            self.file.truncate(HEADER_SIZE + self.allocated * self.dtype.itemsize)
+
+    def append(self, record):
+        """Adds one record (a sequence with one value per field)"""
+        self.chunk_view[self.pending] = record
+        self.pending += 1
+        if self.pending == len(self.chunk):
+            self.flush()
+
+    def extend(self, records):
+        """Adds a 2-D array of records, e.g. the output of RingBuffer.read()"""
+        index = 0
+        while index < len(records):
+            n = min(len(records) - index, len(self.chunk) - self.pending)
+            self.chunk_view[self.pending:self.pending + n] = records[index:index + n]
+            self.pending += n
+            index += n
+            if self.pending == len(self.chunk):
+                self.flush()
+
+    def flush(self):
+        """Writes staged records and publishes the new record count"""
+        if self.pending:
+            self._reserve(self.count + self.pending)
+            self.file.seek(HEADER_SIZE + self.count * self.dtype.itemsize)
+            self.file.write(self.chunk[:self.pending].tobytes())
+            self.count += self.pending
+            self.pending = 0
+        self.file.seek(8)
+        self.file.write(struct.pack("<Q", self.count))
+        self.file.flush()
+
+    def close(self):
+        """Flushes and trims the preallocated tail"""
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_log(path):
+    """Maps a telemetry log as a read-only structured array (no copy).
+
+    Columns are views: open_log(path)["velocity"] is a float64 array.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if header[:8] != LOG_MAGIC:
+        raise ValueError(f"{path} is not a telemetry log")
+    count, n_fields = struct.unpack("<QI", header[8:20])
+    fields = header[20:].rstrip(b"\0").decode("ascii").split(",")[:n_fields]
+    if count == 0:
+        return np.zeros(0, dtype=record_dtype(fields))
+    return np.memmap(path, dtype=record_dtype(fields), mode="r", offset=HEADER_SIZE, shape=(count,))
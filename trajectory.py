@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Time-parameterised multi-joint moves streamed with one Sync Write per tick.
+
+A profile is computed up front as an (n_ticks, n_joints) array of goal
+positions. All joints share one time scaling, so they start and finish
+together. Every tick's Sync Write packet parameters are built before the
+move starts, and the streaming loop only waits and transmits.
+"""
+
+import time
+import numpy as np
+from dynamixel_sdk import *
+from rate_scheduler import RateScheduler
+from dxl_telemetry import MODELS, read_telemetry
+from dxl_baud_manager import find_baudrate
+
+# ---------------- Settings ----------------
+ADDR_GOAL_POSITION      = 116
+GOAL_POSITION_LENGTH    = 4
+
+PROTOCOL_VERSION        = 2.0
+DXL_MODEL               = "XC330"
+DXL_IDS                 = [3]
+BAUDRATE                = 57600
+DEVICENAME              = 'com6'
+
+TARGETS                 = [3000]  # goal position per joint, ticks (servos already in position/joint mode)
+PROFILE                 = "min_jerk"  # or "trapezoid"
+DURATION                = 2.0     # min_jerk move time, s
+MAX_VELOCITY            = 2000.0  # trapezoid limits, ticks/s and ticks/s²
+MAX_ACCELERATION        = 4000.0
+RATE_HZ                 = 100
+
+MIN_JERK = "min_jerk"
+TRAPEZOID = "trapezoid"
+
+
+# ---------------- Profiles ----------------
+def _scale(start, end, s):
+    start = np.asarray(start, dtype=float)
+    end = np.asarray(end, dtype=float)
+    return np.rint(start + np.outer(s, end - start)).astype(np.int64)
+
+
+def min_jerk(start, end, duration, rate_hz):
+    """Minimum-jerk move: zero velocity and acceleration at both ends"""
+    tau = np.linspace(0.0, 1.0, max(2, int(round(duration * rate_hz)) + 1))
+    return _scale(start, end, tau ** 3 * (10 - 15 * tau + 6 * tau ** 2))
+
+
+def trapezoid(start, end, max_velocity, max_acceleration, rate_hz):
+    """Trapezoidal velocity move, timed by the joint with the longest travel.
+
+    Falls back to a triangle when the travel is too short to reach max_velocity.
+    """
+    distance = np.max(np.abs(np.asarray(end, dtype=float) - np.asarray(start, dtype=float)))
+    if distance == 0:
+        return _scale(start, end, np.zeros(1))
+    ramp = max_velocity / max_acceleration
+    if max_acceleration * ramp ** 2 > distance:
+        ramp = np.sqrt(distance / max_acceleration)
+        max_velocity = max_acceleration * ramp
+    duration = distance / max_velocity + ramp
+
+    t = np.linspace(0.0, duration, max(2, int(np.ceil(duration * rate_hz)) + 1))
+    travelled = np.where(
+        t < ramp, 0.5 * max_acceleration * t ** 2,
+        np.where(t < duration - ramp, max_velocity * (t - ramp / 2),
+                 distance - 0.5 * max_acceleration * (duration - t) ** 2))
+    return _scale(start, end, travelled / distance)
+
+
+# ---------------- Streaming ----------------
+class TrajectoryStreamer:
+    """Plays profiles to a fixed set of joints with one Sync Write per tick"""
+
+    def __init__(self, portHandler, packetHandler, dxl_ids, address, length):
+        self.portHandler = portHandler
+        self.packetHandler = packetHandler
+        self.dxl_ids = list(dxl_ids)
+        self.address = address
+        self.length = length
+
+    def packets(self, profile):
+        """Sync Write parameter lists for every tick: [ID, data bytes...] per joint"""
+        profile = np.asarray(profile)
+        data = profile.astype(f"<i{self.length}").view(np.uint8).reshape(len(profile), len(self.dxl_ids), self.length)
+        ids = np.broadcast_to(np.array(self.dxl_ids, dtype=np.uint8)[None, :, None], (len(profile), len(self.dxl_ids), 1))
+        return np.concatenate((ids, data), axis=2).reshape(len(profile), -1).tolist()
+
+    def stream(self, profile, rate_hz):
+        """Sends every row of profile at rate_hz and returns timing statistics"""
+        packets = self.packets(profile)
+        param_length = len(self.dxl_ids) * (1 + self.length)
+        scheduler = RateScheduler(rate_hz)
+        failures = 0
+        send_time = 0.0
+        for param in packets:
+            scheduler.wait()
+            t0 = time.perf_counter()
+            result = self.packetHandler.syncWriteTxOnly(self.portHandler, self.address, self.length,
+                                                        param, param_length)
+            send_time += time.perf_counter() - t0
+            if result != COMM_SUCCESS:
+                failures += 1
+        elapsed = time.perf_counter() - scheduler.start_time
+
+        stats = scheduler.stats()
+        stats.update({
+            "requested_hz": rate_hz,
+            "delivered_hz": (len(packets) - 1) / elapsed if elapsed > 0 and len(packets) > 1 else 0.0,
+            "send_mean": send_time / len(packets),
+            "failures": failures,
+        })
+        return stats
+
+
+def report(stats):
+    return (f"{stats['ticks']} setpoints | requested {stats['requested_hz']:.1f} Hz, "
+            f"delivered {stats['delivered_hz']:.1f} Hz | jitter mean={stats['jitter_mean'] * 1000:.2f} ms "
+            f"max={stats['jitter_max'] * 1000:.2f} ms | overruns={stats['overruns']} skipped={stats['skipped']} | "
+            f"send={stats['send_mean'] * 1000:.2f} ms | failures={stats['failures']}")
+
+
+if __name__ == "__main__":
+    portHandler = PortHandler(DEVICENAME)
+    packetHandler = PacketHandler(PROTOCOL_VERSION)
+    if not portHandler.openPort():
+        print("Failed to open port")
+        quit()
+    if find_baudrate(portHandler, packetHandler, DXL_IDS[0], BAUDRATE) is None:
+        print(f"DXL ID {DXL_IDS[0]} not found at any standard baud rate")
+        quit()
+
+    start = []
+    for dxl_id in DXL_IDS:
+        sample, _, _ = read_telemetry(portHandler, packetHandler, dxl_id, DXL_MODEL)
+        if sample is None:
+            print(f"[ID:{dxl_id:03d}] no response")
+            quit()
+        start.append(sample.position)
+        packetHandler.write1ByteTxRx(portHandler, dxl_id, MODELS[DXL_MODEL]["ADDR_TORQUE_ENABLE"], 1)
+
+    if PROFILE == MIN_JERK:
+        profile = min_jerk(start, TARGETS, DURATION, RATE_HZ)
+    else:
+        profile = trapezoid(start, TARGETS, MAX_VELOCITY, MAX_ACCELERATION, RATE_HZ)
+    print(f"{PROFILE}: {start} → {TARGETS} in {len(profile)} setpoints")
+
+    streamer = TrajectoryStreamer(portHandler, packetHandler, DXL_IDS, ADDR_GOAL_POSITION, GOAL_POSITION_LENGTH)
+    print(report(streamer.stream(profile, RATE_HZ)))
+    portHandler.closePort()